@@ -0,0 +1,146 @@
+################################################################################
+#                                                                              #
+#  CandleSeries.py                                                             #
+#  Author: Cody Johnson <codyj@protonmail.com>                                 #
+#                                                                              #
+################################################################################
+
+# Minute bars in contiguous numpy arrays: int64 times and one float64 row
+# each for open, high, low, close and volume, 8 bytes per value.
+#
+# In ring mode the series keeps the newest capacity bars. The arrays are
+# twice the capacity and bars are written after the last one; when the end
+# is reached the live window is copied back to the front, once per capacity
+# appends. The window is therefore always contiguous and every accessor
+# returns a view, never a copy.
+
+import numpy as np
+
+# Rows of the values array
+OPEN, HIGH, LOW, CLOSE, VOLUME = range(5)
+
+# Fields of a CryptoCompare bar, in the order they are parsed
+FIELDS = ('time', 'open', 'high', 'low', 'close', 'volumefrom')
+
+class CandleSeries:
+    # Class data
+    capacity = 1441         # Bars kept in ring mode, initial size otherwise
+    ring = True             # Drop the oldest bars instead of growing
+    times = None            # int64 unix seconds
+    values = None           # float64 (5, size) open, high, low, close, volume
+    start = 0               # Index of the oldest bar
+    count = 0               # Number of bars
+
+    # Initializer
+    def __init__(self, capacity=1441, ring=True):
+        self.capacity = capacity
+        self.ring = ring
+        size = 2 * capacity if ring else capacity
+        self.times = np.zeros(size, dtype=np.int64)
+        self.values = np.zeros((5, size), dtype=np.float64)
+        self.start = 0
+        self.count = 0
+
+    # Number of bars
+    ############################################################################
+    def __len__(self):
+        return self.count
+
+    # Removes all bars
+    ############################################################################
+    def clear(self):
+        self.start = 0
+        self.count = 0
+
+    # Parses CryptoCompare bar dicts and appends them in place
+    ############################################################################
+    def extend(self, bars):
+        self.appendArrays(*parseBars(bars))
+
+    # Appends times and (5, n) values, dropping the oldest bars in ring mode
+    ############################################################################
+    def appendArrays(self, times, values):
+        n = len(times)
+        if self.ring and n > self.capacity:
+            times = times[-self.capacity:]
+            values = values[:, -self.capacity:]
+            n = self.capacity
+        self.reserve(n)
+
+        end = self.start + self.count
+        self.times[end:end + n] = times
+        self.values[:, end:end + n] = values
+        self.count += n
+
+        # Ring mode: forget the oldest bars beyond capacity
+        if self.ring and self.count > self.capacity:
+            self.start += self.count - self.capacity
+            self.count = self.capacity
+
+    # Makes room for n more bars after the last one
+    ############################################################################
+    def reserve(self, n):
+        size = len(self.times)
+        if self.start + self.count + n <= size:
+            return
+
+        keep = self.count
+        if self.ring:
+            # Only the bars that survive the append are moved to the front
+            keep = min(self.count, self.capacity - n)
+        elif self.count + n > size:
+            size = max(2 * size, self.count + n)
+
+        if size == len(self.times):
+            times, values = self.times, self.values
+        else:
+            times = np.zeros(size, dtype=np.int64)
+            values = np.zeros((5, size), dtype=np.float64)
+
+        first = self.start + self.count - keep
+        times[:keep] = self.times[first:first + keep]
+        values[:, :keep] = self.values[:, first:first + keep]
+        self.times, self.values = times, values
+        self.start = 0
+        self.count = keep
+
+    # Replaces the newest bar with a CryptoCompare bar dict
+    ############################################################################
+    def setLast(self, bar):
+        last = self.start + self.count - 1
+        self.times[last] = int(bar['time'])
+        for row, field in enumerate(FIELDS[1:]):
+            self.values[row, last] = float(bar[field])
+
+    # Returns the time of the newest bar, None if empty
+    ############################################################################
+    def lastTime(self):
+        if not self.count:
+            return None
+        return int(self.times[self.start + self.count - 1])
+
+    # Returns a view of the times
+    ############################################################################
+    def getTimes(self):
+        return self.times[self.start:self.start + self.count]
+
+    # Returns a view of one value row, OPEN through VOLUME
+    ############################################################################
+    def getRow(self, row):
+        return self.values[row, self.start:self.start + self.count]
+
+    # Returns views of opens, highs, lows, closes and volumes
+    ############################################################################
+    def getOhlcv(self):
+        return tuple(self.getRow(row) for row in range(5))
+
+
+# Parses CryptoCompare bar dicts in one pass, returns int64 times and
+# (5, n) float64 values
+################################################################################
+def parseBars(bars):
+    parsed = np.fromiter((tuple(bar[field] for field in FIELDS)
+        for bar in bars), dtype=[(field, np.float64) for field in FIELDS],
+        count=len(bars))
+    return (parsed['time'].astype(np.int64),
+        np.vstack([parsed[field] for field in FIELDS[1:]]))
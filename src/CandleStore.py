@@ -0,0 +1,221 @@
+################################################################################
+#                                                                              #
+#  CandleStore.py                                                              #
+#  Author: Cody Johnson <codyj@protonmail.com>                                 #
+#                                                                              #
+################################################################################
+
+# On-disk bar history per symbol, one fixed-width binary file per column
+# (int64 times, float64 open, high, low, close and volume) opened through
+# numpy.memmap. Minute bars are stored as they arrive and 5 minute, hourly
+# and daily levels are kept beside them: each append recomputes only the
+# coarse bars its minutes fall into.
+#
+# Reads are binary searches on the time column and return slices of the
+# maps, so a chart of any range touches only the pages it shows and the
+# history never has to fit in memory. Files grow by doubling; the number
+# of bars in use per level is kept in Meta.json.
+
+import json, os, os.path
+import numpy as np
+from CandleSeries import OPEN, HIGH, LOW, CLOSE, VOLUME
+
+# Pyramid levels, finest first: (name, seconds per bar)
+LEVELS = (('1m', 60), ('5m', 300), ('1h', 3600), ('1d', 86400))
+
+# Column files of a level: <level>.<column>
+COLUMNS = ('time', 'open', 'high', 'low', 'close', 'volume')
+
+class CandleLevel:
+    # Class data
+    directory = ''          # Directory of the symbol's column files
+    name = ''               # Level name: "1m"
+    step = 60               # Seconds per bar
+    count = 0               # Bars in use
+    capacity = 0            # Bars the files have room for
+    minCapacity = 4096      # Bars allocated when the files are created
+    times = None            # int64 memmap of bar start times (unix seconds)
+    values = []             # float64 memmaps: open, high, low, close, volume
+
+    # Initializer
+    def __init__(self, directory, name, step, count):
+        self.directory = directory
+        self.name = name
+        self.step = step
+        self.values = []
+
+        path = self.path('time')
+        capacity = os.path.getsize(path) // 8 if os.path.exists(path) else 0
+        self.map(max(capacity, self.minCapacity))
+        self.count = min(count, self.capacity)
+
+    # Returns the path of a column file
+    ############################################################################
+    def path(self, column):
+        return os.path.join(self.directory, self.name + '.' + column)
+
+    # Grows the column files to capacity bars and maps them
+    ############################################################################
+    def map(self, capacity):
+        for column in COLUMNS:
+            path = self.path(column)
+            with open(path, 'r+b' if os.path.exists(path) else 'w+b') as f:
+                if os.fstat(f.fileno()).st_size < capacity * 8:
+                    f.truncate(capacity * 8)
+
+        # Slices of the old maps handed out earlier stay valid
+        self.times = np.memmap(self.path('time'), dtype=np.int64, mode='r+',
+            shape=(capacity,))
+        self.values = [np.memmap(self.path(column), dtype=np.float64,
+            mode='r+', shape=(capacity,)) for column in COLUMNS[1:]]
+        self.capacity = capacity
+
+    # Writes bars from position on, dropping any bars after them
+    ############################################################################
+    def write(self, position, times, values):
+        end = position + len(times)
+        if end > self.capacity:
+            self.flush()
+            self.map(max(2 * self.capacity, end))
+
+        self.times[position:end] = times
+        for row in range(5):
+            self.values[row][position:end] = values[row]
+        self.count = end
+
+    # Writes dirty pages to disk
+    ############################################################################
+    def flush(self):
+        self.times.flush()
+        for column in self.values:
+            column.flush()
+
+    # Returns the index of the first bar at or after time
+    ############################################################################
+    def find(self, time):
+        return int(np.searchsorted(self.times[:self.count], time))
+
+    # Returns the time of the newest bar, None if empty
+    ############################################################################
+    def lastTime(self):
+        if not self.count:
+            return None
+        return int(self.times[self.count - 1])
+
+    # Returns times and (open, high, low, close, volume) views of bars
+    # first up to last
+    ############################################################################
+    def slice(self, first, last):
+        return (self.times[first:last],
+            tuple(column[first:last] for column in self.values))
+
+    # Returns index bounds of the bars starting in [start, end]
+    ############################################################################
+    def span(self, start, end):
+        times = self.times[:self.count]
+        return (int(np.searchsorted(times, start)),
+            int(np.searchsorted(times, end, side='right')))
+
+
+class CandleStore:
+    # Class data
+    directory = ''          # Directory of this symbol's files
+    levels = []             # CandleLevel per LEVELS entry, finest first
+    maxBars = 2000          # Bars returned by getRange before going coarser
+
+    # Initializer
+    def __init__(self, symbol, directory='../data/Candles'):
+        self.directory = os.path.join(directory, symbol.lower())
+        os.makedirs(self.directory, exist_ok=True)
+
+        counts = self.loadMeta()
+        self.levels = [CandleLevel(self.directory, name, step,
+            counts.get(name, 0)) for name, step in LEVELS]
+
+    # Returns the bar count per level saved by the last append
+    ############################################################################
+    def loadMeta(self):
+        path = os.path.join(self.directory, 'Meta.json')
+        if not os.path.exists(path):
+            return {}
+
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    # Saves the bar count per level, replacing the file atomically
+    ############################################################################
+    def saveMeta(self):
+        path = os.path.join(self.directory, 'Meta.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump({level.name: level.count for level in self.levels}, f)
+        os.replace(path + '.tmp', path)
+
+    # Returns the time of the newest minute bar, None if empty
+    ############################################################################
+    def lastTime(self):
+        return self.levels[0].lastTime()
+
+    # Stores minute bars, times and (5, n) values, and updates the coarser
+    # levels. Bars older than the newest stored one are ignored, one at the
+    # same time replaces it
+    ############################################################################
+    def append(self, times, values):
+        minutes = self.levels[0]
+        times = np.asarray(times, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+
+        lastTime = minutes.lastTime()
+        if lastTime is not None:
+            keep = times >= lastTime
+            times, values = times[keep], values[:, keep]
+        if not len(times):
+            return
+
+        minutes.write(minutes.find(times[0]), times, values)
+        for level in self.levels[1:]:
+            self.rebuild(level, int(times[0]))
+
+        for level in self.levels:
+            level.flush()
+        self.saveMeta()
+
+    # Recomputes the bars of level from the one holding time onward
+    ############################################################################
+    def rebuild(self, level, time):
+        minutes = self.levels[0]
+        start = time // level.step * level.step
+        times, rows = minutes.slice(minutes.find(start), minutes.count)
+
+        buckets = times // level.step * level.step
+        starts = np.flatnonzero(np.append(True, buckets[1:] != buckets[:-1]))
+        ends = np.append(starts[1:], len(times)) - 1
+
+        values = np.empty((5, len(starts)))
+        values[OPEN] = rows[OPEN][starts]
+        values[HIGH] = np.maximum.reduceat(rows[HIGH], starts)
+        values[LOW] = np.minimum.reduceat(rows[LOW], starts)
+        values[CLOSE] = rows[CLOSE][ends]
+        values[VOLUME] = np.add.reduceat(rows[VOLUME], starts)
+        level.write(level.find(start), buckets[starts], values)
+
+    # Returns times and OHLCV views of minute bars starting in [start, end]
+    ############################################################################
+    def getMinutes(self, start, end):
+        minutes = self.levels[0]
+        return minutes.slice(*minutes.span(start, end))
+
+    # Returns times and OHLCV views of bars starting in [start, end] from
+    # the finest level with at most maxBars of them, the daily level if none
+    ############################################################################
+    def getRange(self, start, end, maxBars=None):
+        if maxBars is None:
+            maxBars = self.maxBars
+
+        for level in self.levels:
+            first, last = level.span(start, end)
+            if last - first <= maxBars:
+                break
+        return level.slice(first, last)
@@ -0,0 +1,132 @@
+################################################################################
+#                                                                              #
+#  Candles.py                                                                  #
+#  Author: Cody Johnson <codyj@protonmail.com>                                 #
+#                                                                              #
+################################################################################
+
+# OHLCV bars for candlestick and volume charts. Bars live in one reusable
+# (6, capacity) array; resampling to the pixel width and building the body,
+# wick and volume quads are done with whole-array numpy operations, so the
+# charts can draw any number of bars as one collection.
+
+import numpy as np
+
+# Rows of an OHLCV array
+TIME, OPEN, HIGH, LOW, CLOSE, VOLUME = range(6)
+
+# Chart modes
+LINE = 'line'               # Close prices as a line
+CANDLES = 'candles'         # Candlesticks
+VOLUMES = 'volumes'         # Volume bars
+
+class OhlcvBuffer:
+    # Class data
+    data = None             # (6, capacity) float64 rows, see TIME..VOLUME
+    count = 0               # Bars in use
+
+    # Initializer
+    def __init__(self, capacity=1024):
+        self.data = np.empty((6, capacity))
+        self.count = 0
+
+    # Copies bars in, growing the array only when they do not fit
+    ############################################################################
+    def set(self, times, opens, highs, lows, closes, volumes):
+        count = len(times)
+        if count > self.data.shape[1]:
+            self.data = np.empty((6, max(count, 2 * self.data.shape[1])))
+
+        for row, values in enumerate((times, opens, highs, lows, closes,
+                volumes)):
+            self.data[row, :count] = values
+        self.count = count
+
+    # Returns the bars in use, a view into the buffer
+    ############################################################################
+    def view(self):
+        return self.data[:, :self.count]
+
+
+# Merges neighboring bars so at most maxBars remain, returns bars and the
+# number of source bars per bar
+################################################################################
+def resample(bars, maxBars):
+    count = bars.shape[1]
+    if count <= maxBars or maxBars < 1:
+        return bars, 1
+
+    size = -(-count // maxBars)
+    starts = np.arange(0, count, size)
+    ends = np.append(starts[1:], count) - 1
+
+    merged = np.empty((6, len(starts)))
+    merged[TIME] = bars[TIME, starts]
+    merged[OPEN] = bars[OPEN, starts]
+    merged[HIGH] = np.maximum.reduceat(bars[HIGH], starts)
+    merged[LOW] = np.minimum.reduceat(bars[LOW], starts)
+    merged[CLOSE] = bars[CLOSE, ends]
+    merged[VOLUME] = np.add.reduceat(bars[VOLUME], starts)
+    return merged, size
+
+# Returns the width of one bar in time units, leaving a gap between bars
+################################################################################
+def barWidth(times, fill=0.7):
+    if len(times) < 2:
+        return 60.0 * fill
+    return (times[-1] - times[0]) / (len(times) - 1) * fill
+
+# Returns a mask of bars that closed at or above their open
+################################################################################
+def rising(bars):
+    return bars[CLOSE] >= bars[OPEN]
+
+# Fills out with a zero-width wick quad per bar, then a body quad per bar
+# drawn over it, returns the (2 * bars, 4, 2) vertices in use
+################################################################################
+def candleVerts(x, bars, width, out):
+    count = len(x)
+    verts = out[:2 * count]
+    left = x - width / 2
+    right = x + width / 2
+    bottom = np.minimum(bars[OPEN], bars[CLOSE])
+    top = np.maximum(bars[OPEN], bars[CLOSE])
+
+    # Wicks, drawn by their edges
+    verts[:count, :, 0] = x[:, None]
+    verts[:count, :, 1] = np.stack((bars[LOW], bars[HIGH], bars[HIGH],
+        bars[LOW]), axis=1)
+
+    # Bodies
+    verts[count:, :, 0] = np.stack((left, left, right, right), axis=1)
+    verts[count:, :, 1] = np.stack((bottom, top, top, bottom), axis=1)
+    return verts
+
+# Fills out with a quad from zero to the volume per bar, returns the
+# (bars, 4, 2) vertices in use
+################################################################################
+def volumeVerts(x, bars, width, out):
+    count = len(x)
+    verts = out[:count]
+    left = x - width / 2
+    right = x + width / 2
+    zero = np.zeros(count)
+
+    verts[:, :, 0] = np.stack((left, left, right, right), axis=1)
+    verts[:, :, 1] = np.stack((zero, bars[VOLUME], bars[VOLUME], zero),
+        axis=1)
+    return verts
+
+# Returns a reusable vertex array that holds at least count quads
+################################################################################
+def reserveVerts(verts, count):
+    if verts is None or len(verts) < count:
+        return np.empty((max(count, 1024), 4, 2))
+    return verts
+
+# Returns the values the y limits must cover for mode
+################################################################################
+def limitValues(bars, mode):
+    if mode == VOLUMES:
+        return np.append(bars[VOLUME], 0.0)
+    return np.concatenate((bars[LOW], bars[HIGH]))
@@ -0,0 +1,270 @@
+################################################################################
+#                                                                              #
+#  ChartRenderer.py                                                            #
+#  Author: Cody Johnson <codyj@protonmail.com>                                 #
+#                                                                              #
+################################################################################
+
+# Off-GUI-thread chart pipeline. A render thread rasterizes each chart into
+# its Agg buffer and copies the pixels into one of two preallocated QImages.
+# The GUI thread only paints the finished QImage, so slow chart renders never
+# block input handling. QImage is copy-on-write: if the view still holds the
+# back buffer, writing to it detaches instead of tearing the shown frame.
+#
+# Hovering a view draws a crosshair and readout over the last frame from
+# the frame's ChartLayout; the chart itself is not rendered again.
+#
+# Charts whose view is hidden are not rendered. Their latest data stays
+# queued on the chart and is rendered once when the view is shown again,
+# while the view keeps painting its last frame until then.
+
+import threading
+import numpy as np
+from PyQt5 import QtWidgets
+from PyQt5.QtGui import QImage, QPainter, QPen, QColor, QFontMetrics
+from PyQt5.QtCore import Qt, QPointF, QRectF, pyqtSlot, pyqtSignal
+
+class ChartView(QtWidgets.QWidget):
+    # Create signals
+    frameReady = pyqtSignal(QImage, object)
+    resized = pyqtSignal(int, int, float)
+
+    # Class data
+    frame = None            # Last finished frame
+    hoverLayout = None      # ChartLayout of the frame, None if not hoverable
+    mousePos = None         # Last mouse position, None when outside
+    hover = None            # (bar index, frame pixel y) under the crosshair
+
+    # Initializer
+    def __init__(self, parent=None):
+        super(ChartView, self).__init__(parent)
+        self.setMouseTracking(True)
+        self.frameReady.connect(self.setFrame)
+
+    # Shows a finished frame
+    ############################################################################
+    @pyqtSlot(QImage, object)
+    def setFrame(self, image, layout):
+        self.frame = image
+        self.hoverLayout = layout
+        self.hover = self.hitTest()
+        self.update()
+
+    # Returns (bar index, frame pixel y) under the mouse, or None
+    ############################################################################
+    def hitTest(self):
+        if self.mousePos is None or self.hoverLayout is None:
+            return None
+
+        ratio = self.devicePixelRatioF()
+        px = self.mousePos.x() * ratio
+        py = self.mousePos.y() * ratio
+        if not self.hoverLayout.contains(px, py):
+            return None
+        return (self.hoverLayout.nearest(px), py)
+
+    # Moves the crosshair, repainting only when it lands somewhere new
+    ############################################################################
+    def mouseMoveEvent(self, event):
+        self.mousePos = event.pos()
+        hover = self.hitTest()
+        if hover != self.hover:
+            self.hover = hover
+            self.update()
+
+    # Hides the crosshair
+    ############################################################################
+    def leaveEvent(self, event):
+        self.mousePos = None
+        if self.hover is not None:
+            self.hover = None
+            self.update()
+
+    # Asks the renderer for a frame at the new pixel size
+    ############################################################################
+    def resizeEvent(self, event):
+        ratio = self.devicePixelRatioF()
+        self.resized.emit(int(self.width() * ratio),
+            int(self.height() * ratio), ratio)
+
+    # Paints the last frame, the only chart work done on the GUI thread
+    ############################################################################
+    def paintEvent(self, event):
+        if self.frame is None:
+            return
+
+        painter = QPainter(self)
+        painter.drawImage(0, 0, self.frame)
+        if self.hover is not None:
+            self.drawCrosshair(painter)
+        painter.end()
+
+    # Draws crosshair lines and the readout box over the frame
+    ############################################################################
+    def drawCrosshair(self, painter):
+        i, py = self.hover
+        layout = self.hoverLayout
+        ratio = self.devicePixelRatioF()
+        left, top, width, height = [value / ratio
+            for value in layout.plotRect]
+        x = layout.toX(layout.times[i]) / ratio
+        y = py / ratio
+
+        painter.setPen(QPen(QColor(96, 96, 96), 1, Qt.DashLine))
+        painter.drawLine(QPointF(x, top), QPointF(x, top + height))
+        painter.drawLine(QPointF(left, y), QPointF(left + width, y))
+
+        # Readout follows the cursor, flipped to stay inside the plot
+        lines = layout.readout(i) + ['@ ' + '{:,.2f}'.format(
+            layout.fromY(py))]
+        metrics = QFontMetrics(painter.font())
+        box = QRectF(0, 0, max(metrics.width(line) for line in lines) + 8,
+            metrics.lineSpacing() * len(lines) + 4)
+        box.moveTo(x + 8, y + 8)
+        if box.right() > left + width:
+            box.moveRight(x - 8)
+        if box.bottom() > top + height:
+            box.moveBottom(y - 8)
+        box.moveTo(max(box.left(), 0), max(box.top(), 0))
+
+        painter.setPen(QColor(96, 96, 96))
+        painter.setBrush(QColor(255, 255, 224, 230))
+        painter.drawRect(box)
+        painter.setPen(Qt.black)
+        painter.drawText(box.adjusted(4, 2, -4, -2), Qt.AlignLeft,
+            '\n'.join(lines))
+
+
+class ChartRenderer:
+    # Class data
+    views = {}              # ChartView per chart
+    buffers = {}            # Two QImages per chart, reused between frames
+    ratios = {}             # Device pixel ratio of each chart's view
+    pending = []            # Charts waiting to be rendered
+    hidden = set()          # Charts whose view is not on screen
+    stale = set()           # Hidden charts with changes not yet rendered
+    thread = None           # Render thread
+    stopped = True          # Flag to stop rendering
+
+    # Initializer
+    def __init__(self):
+        self.views = {}
+        self.buffers = {}
+        self.ratios = {}
+        self.pending = []
+        self.hidden = set()
+        self.stale = set()
+        self.condition = threading.Condition()
+
+    # Pairs a chart with the view showing it
+    ############################################################################
+    def addChart(self, chart, view):
+        self.views[chart] = view
+        self.buffers[chart] = [None, None]
+        self.ratios[chart] = 1.0
+        view.resized.connect(lambda w, h, r: self.resize(chart, w, h, r))
+
+    # Starts the render thread
+    ############################################################################
+    def start(self):
+        with self.condition:
+            if not self.stopped:
+                return
+            self.stopped = False
+
+        self.thread = threading.Thread(target=self.run, args=())
+        self.thread.daemon = True
+        self.thread.start()
+
+    # Stops the render thread
+    ############################################################################
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+
+    # Queues new data for chart, safe to call from any thread
+    ############################################################################
+    def update(self, chart, times, prices, ohlcv=None):
+        chart.setData(times, prices, ohlcv)
+        self.request(chart)
+
+    # Queues an empty frame for chart
+    ############################################################################
+    def clear(self, chart):
+        chart.clear()
+        self.request(chart)
+
+    # Queues a render at a new pixel size
+    ############################################################################
+    def resize(self, chart, width, height, ratio=1.0):
+        self.ratios[chart] = ratio
+        chart.setSize(width, height)
+        self.request(chart)
+
+    # Pauses rendering of a hidden chart, catches up when it is shown
+    ############################################################################
+    def setVisible(self, chart, visible):
+        with self.condition:
+            if not visible:
+                self.hidden.add(chart)
+                if chart in self.pending:
+                    self.pending.remove(chart)
+                    self.stale.add(chart)
+                return
+
+            self.hidden.discard(chart)
+            if chart in self.stale:
+                self.stale.discard(chart)
+                if chart not in self.pending:
+                    self.pending.append(chart)
+                    self.condition.notify_all()
+
+    # Marks chart for rendering, repeated requests coalesce
+    ############################################################################
+    def request(self, chart):
+        with self.condition:
+            if chart in self.hidden:
+                self.stale.add(chart)
+            elif chart not in self.pending:
+                self.pending.append(chart)
+                self.condition.notify_all()
+
+    # Render loop, sleeps until a chart is requested
+    ############################################################################
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.stopped:
+                    self.condition.wait()
+                if self.stopped:
+                    return
+                chart = self.pending.pop(0)
+
+            try:
+                self.renderChart(chart)
+            except Exception as err:
+                print('Chart render failed: ' + str(err))
+
+    # Rasterizes chart and hands the frame to its view
+    ############################################################################
+    def renderChart(self, chart):
+        view = self.views[chart]
+        pixels = np.asarray(chart.render())
+        height, width = pixels.shape[:2]
+
+        # Write into the buffer the view is not showing
+        buffers = self.buffers[chart]
+        image = buffers[1]
+        if image is None or image.width() != width or image.height() != height:
+            image = QImage(width, height, QImage.Format_RGBA8888)
+        image.setDevicePixelRatio(self.ratios[chart])
+
+        bits = image.bits()
+        bits.setsize(image.byteCount())
+        target = np.frombuffer(bits, np.uint8).reshape(height,
+            image.bytesPerLine())
+        target[:, :width * 4] = pixels.reshape(height, width * 4)
+
+        buffers[0], buffers[1] = image, buffers[0]
+        view.frameReady.emit(image, chart.layout)
@@ -0,0 +1,165 @@
+################################################################################
+#                                                                              #
+#  ConnectivityMonitor.py                                                      #
+#  Author: Cody Johnson <codyj@protonmail.com>                                 #
+#                                                                              #
+################################################################################
+
+# Infers link state from the outcome of real exchange requests. A probe is
+# only sent when nothing else has touched the network for a while, so an
+# active session never adds probe traffic. Threads that need the network
+# block on a condition until the link comes back.
+
+import threading, time
+
+class ConnectivityMonitor:
+    # Class data
+    online = False          # Current link state
+    known = False           # True once any outcome has been observed
+    failures = 0            # Consecutive failed requests
+    maxFailures = 2         # Failures in a row before going offline
+    lastActivity = 0.0      # Monotonic time of last reported outcome
+    idleInterval = 30.0     # Idle seconds online before probing
+    minProbeInterval = 2.0  # First probe delay while offline
+    maxProbeInterval = 30.0 # Upper bound for offline probe delay
+    probeInterval = 2.0     # Current offline probe delay
+    probe = None            # Callable sending one cheap request
+    listeners = []          # Callbacks(bool) run on state change
+    thread = None           # Thread running idle probes
+    stopped = True          # Flag to stop probing
+
+    # Initializer
+    def __init__(self, probe=None, idleInterval=30.0):
+        self.probe = probe
+        self.idleInterval = idleInterval
+        self.listeners = []
+        self.condition = threading.Condition()
+
+    # Starts the idle probe thread
+    ############################################################################
+    def start(self):
+        with self.condition:
+            if not self.stopped:
+                return
+            self.stopped = False
+
+        self.thread = threading.Thread(target=self.run, args=())
+        self.thread.daemon = True
+        self.thread.start()
+
+    # Stops probing and releases any waiters
+    ############################################################################
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+
+    # Registers callback(bool) for link state changes
+    ############################################################################
+    def addListener(self, callback):
+        self.listeners.append(callback)
+
+    # Returns True while the link is up
+    ############################################################################
+    def isOnline(self):
+        return self.online
+
+    # Blocks until online, stopped or timeout, returns link state
+    ############################################################################
+    def waitUntilOnline(self, timeout=None):
+        with self.condition:
+            self.condition.wait_for(lambda: self.online or self.stopped,
+                timeout)
+            return self.online
+
+    # Records a request that reached the server
+    ############################################################################
+    def reportSuccess(self):
+        with self.condition:
+            self.lastActivity = time.monotonic()
+            self.failures = 0
+            changed = self.setOnline(True)
+        self.notifyListeners(changed)
+
+    # Records a request that failed to connect or timed out
+    ############################################################################
+    def reportFailure(self):
+        with self.condition:
+            self.lastActivity = time.monotonic()
+            self.failures += 1
+            changed = False
+            if self.failures >= self.maxFailures or not self.known:
+                changed = self.setOnline(False)
+        self.notifyListeners(changed)
+
+    # Sets link state, caller holds the condition, returns True on change
+    ############################################################################
+    def setOnline(self, status):
+        changed = status != self.online or not self.known
+        self.known = True
+        self.online = status
+
+        if changed:
+            self.probeInterval = self.minProbeInterval
+            self.condition.notify_all()
+
+        return changed
+
+    # Runs listeners outside the lock
+    ############################################################################
+    def notifyListeners(self, changed):
+        if not changed:
+            return
+
+        for callback in self.listeners:
+            callback(self.online)
+
+    # Probe loop, sleeps until the link has been idle long enough
+    ############################################################################
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.stopped:
+                    # Online: probe after idleInterval without traffic.
+                    # Offline: probe with backoff, nothing else is trying.
+                    interval = (self.idleInterval if self.online
+                        else self.probeInterval)
+                    wait = self.lastActivity + interval - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self.condition.wait(wait)
+
+                if self.stopped:
+                    return
+
+                # The probe counts as activity even if it bypasses reporting
+                self.lastActivity = time.monotonic()
+                if not self.online:
+                    self.probeInterval = min(self.probeInterval * 2,
+                        self.maxProbeInterval)
+
+            self.sendProbe()
+
+    # Sends one probe, the transport reports its outcome
+    ############################################################################
+    def sendProbe(self):
+        try:
+            self.probe()
+        except Exception as err:
+            pass
+
+
+# Shared connectivity monitor instance
+################################################################################
+connectivityMonitor = None
+connectivityMonitorLock = threading.Lock()
+
+# Returns the process-wide connectivity monitor, creating it on first use
+################################################################################
+def getConnectivityMonitor():
+    global connectivityMonitor
+
+    with connectivityMonitorLock:
+        if connectivityMonitor is None:
+            connectivityMonitor = ConnectivityMonitor()
+        return connectivityMonitor
@@ -0,0 +1,93 @@
+################################################################################
+#                                                                              #
+#  Crosshair.py                                                                #
+#  Author: Cody Johnson <codyj@protonmail.com>                                 #
+#                                                                              #
+################################################################################
+
+# Hover lookup for charts. Each rendered frame comes with a ChartLayout: the
+# plot rectangle, axis limits and a copy of the sorted bar times and values.
+# The view maps the mouse to a time and finds the nearest bar by binary
+# search, so a hover costs O(log n) and never touches the render thread.
+
+from datetime import datetime as dt
+import numpy as np
+import Candles
+
+class ChartLayout:
+    # Class data
+    plotRect = None         # (left, top, width, height) in frame pixels
+    xLimits = None          # (min, max) unix seconds shown
+    yLimits = None          # (min, max) values shown
+    times = None            # Sorted unix seconds of each bar
+    columns = []            # (label, values) pairs shown in the readout
+
+    # Initializer
+    def __init__(self, plotRect, xLimits, yLimits, times, columns):
+        self.plotRect = plotRect
+        self.xLimits = xLimits
+        self.yLimits = yLimits
+        self.times = times
+        self.columns = columns
+
+    # Returns True if frame pixel px, py is inside the plot
+    ############################################################################
+    def contains(self, px, py):
+        left, top, width, height = self.plotRect
+        return (len(self.times) > 0 and left <= px <= left + width
+            and top <= py <= top + height)
+
+    # Maps unix time to frame pixel x
+    ############################################################################
+    def toX(self, value):
+        left, top, width, height = self.plotRect
+        xMin, xMax = self.xLimits
+        return left + (value - xMin) / (xMax - xMin) * width
+
+    # Maps frame pixel y to a value
+    ############################################################################
+    def fromY(self, py):
+        left, top, width, height = self.plotRect
+        yMin, yMax = self.yLimits
+        return yMax - (py - top) / height * (yMax - yMin)
+
+    # Returns index of the bar nearest to frame pixel x
+    ############################################################################
+    def nearest(self, px):
+        left, top, width, height = self.plotRect
+        xMin, xMax = self.xLimits
+        value = xMin + (px - left) / width * (xMax - xMin)
+
+        i = int(np.searchsorted(self.times, value))
+        if i >= len(self.times):
+            return len(self.times) - 1
+        if i > 0 and value - self.times[i - 1] < self.times[i] - value:
+            return i - 1
+        return i
+
+    # Returns the readout lines for bar i: time, then one per column
+    ############################################################################
+    def readout(self, i):
+        lines = [dt.fromtimestamp(self.times[i]).strftime('%Y-%m-%d %H:%M')]
+        for label, values in self.columns:
+            lines.append((label + ' ' if label else '')
+                + '{:,.2f}'.format(values[i]))
+        return lines
+
+
+# Returns a layout copying times and values, with OHLCV columns if bars has
+# one bar per time and only the price otherwise
+################################################################################
+def makeLayout(plotRect, xLimits, yLimits, times, prices, bars=None):
+    if xLimits is None or yLimits is None or times is None:
+        return None
+
+    times = np.array(times, dtype=float)
+    if bars is not None and bars.shape[1] == len(times):
+        columns = [(label, bars[row].copy()) for label, row
+            in (('O', Candles.OPEN), ('H', Candles.HIGH), ('L', Candles.LOW),
+            ('C', Candles.CLOSE), ('V', Candles.VOLUME))]
+    else:
+        columns = [('', np.array(prices, dtype=float))]
+
+    return ChartLayout(plotRect, xLimits, yLimits, times, columns)
@@ -5,106 +5,147 @@
 #                                                                              #
 ################################################################################
 
-import sys, json, datetime, time, math, requests
+import sys, json, datetime, time, math
+from HttpTransport import getTransport
+from Resilience import getResilience
 from datetime import date, timedelta, datetime
 import numpy as np
+from CandleSeries import CandleSeries, parseBars, OPEN, HIGH, LOW, CLOSE
+from CandleStore import CandleStore
 
 class CryptoCompareAPI:
     # Class data
     baseUrl = 'https://min-api.cryptocompare.com/data/histominute'
-
-    btcusdData = []
-    btcusdTimes = []
-    #btcusdOpens = []
-    btcusdCloses = []
-    btcusdHighs = []
-    btcusdLows = []
+    transport = None    # Shared pooled HTTP transport
+    minutes = 1440      # Minutes of history kept in the rolling window
+    chartMinutes = 1440 # Minutes charted, read from the stores if longer
+    btcusdSeries = None # BTC minute bars
+    ethusdSeries = None # ETH minute bars
+    btcusdStore = None  # BTC bar history on disk
+    ethusdStore = None  # ETH bar history on disk
     btcusdRange = ''
     btcusdDelta = ''
-
-    ethusdData = []
-    ethusdTimes = []
-    #ethusdOpens = []
-    ethusdCloses = []
-    ethusdHighs = []
-    ethusdLows = []
     ethusdRange = ''
     ethusdDelta = ''
 
     # Initializer
-    def __init__(self):
+    def __init__(self, minutes=1440, chartMinutes=None,
+            storeDir='../data/Candles'):
+        self.transport = getTransport()
+        self.minutes = minutes
+        self.chartMinutes = chartMinutes if chartMinutes else minutes
+
+        # Rolling windows, limit=n returns n+1 bars
+        self.btcusdSeries = CandleSeries(minutes + 1)
+        self.ethusdSeries = CandleSeries(minutes + 1)
+        self.btcusdStore = CandleStore('btcusd', storeDir)
+        self.ethusdStore = CandleStore('ethusd', storeDir)
+
         self.updateTradeHistory()
 
     # Updates trade data history
     ############################################################################
     def updateTradeHistory(self):
-        # TODO: Allow parameter to set day range
-        btcusdParams = '?fsym=BTC&tsym=USD&limit=1440&e=Gemini'
-        ethusdParams = '?fsym=ETH&tsym=USD&limit=1440&e=Gemini'
+        self.syncHistory(self.btcusdSeries, self.btcusdStore, 'BTC')
+        self.syncHistory(self.ethusdSeries, self.ethusdStore, 'ETH')
 
-        # Get BTCUSD trades
-        response = requests.request('GET', self.baseUrl+btcusdParams)
-        btcusdHistory = json.loads(response.text)
-        self.btcusdData = btcusdHistory['Data']
+    # Appends bars newer than the series' last bar, evicting the oldest, and
+    # stores them
+    ############################################################################
+    def syncHistory(self, series, store, fsym):
+        now = int(time.time())
+
+        # Start from the stored window, only later minutes are fetched
+        if not len(series) and store.lastTime() is not None:
+            times, ohlcv = store.getMinutes(now - self.minutes * 60, now)
+            series.appendArrays(times, np.vstack(ohlcv))
+        lastTime = series.lastTime()
+
+        # Full load on first call or after a gap longer than the window
+        if lastTime is None or (now - lastTime) // 60 >= self.minutes:
+            times, values = parseBars(self.getBars(fsym, self.minutes, now))
+            series.clear()
+            series.appendArrays(times, values)
+            store.append(times, values)
+            return
+
+        # Refetch the last stored bar as well, it may have been partial
+        limit = max((now - lastTime) // 60, 1)
+        bars = self.getBars(fsym, limit, now)
+        for bar in bars:
+            if bar['time'] == lastTime:
+                series.setLast(bar)
+
+        times, values = parseBars(bars)
+        newer = times > lastTime
+        series.appendArrays(times[newer], values[:, newer])
+        store.append(times, values)
+
+    # Receives limit+1 minute bars ending at toTs from CryptoCompare
+    ############################################################################
+    def getBars(self, fsym, limit, toTs):
+        params = ('?fsym=' + fsym + '&tsym=USD&limit=' + str(limit)
+            + '&toTs=' + str(toTs) + '&e=Gemini')
+        history = getResilience().call('histominute',
+            lambda: self.transport.getJson(self.baseUrl+params))
 
-        # Get ETHUSD trades
-        response = requests.request('GET', self.baseUrl+ethusdParams)
-        ethusdHistory = json.loads(response.text)
-        self.ethusdData = ethusdHistory['Data']
+        return history['Data']
 
-    # Receive trade history from CryptoCompare
+    # Receive trade history from CryptoCompare, times, closes and OHLCV are
+    # views into the series or the stores
     ############################################################################
     def getTradeHistory(self):
-        # Parse and compute
-        self.separateData()
-        self.computePriceRange()
-        self.computePriceDelta()
-
-        btcusdTuple = ( self.btcusdTimes, self.btcusdCloses,
-                        self.btcusdRange, self.btcusdDelta)
-        ethusdTuple = ( self.ethusdTimes, self.ethusdCloses,
-                        self.ethusdRange, self.ethusdDelta)
+        btcusdTimes, btcusdOhlcv = self.getChartBars(self.btcusdSeries,
+            self.btcusdStore)
+        ethusdTimes, ethusdOhlcv = self.getChartBars(self.ethusdSeries,
+            self.ethusdStore)
+
+        # Range and delta are shown as 24-hour values, whatever is charted
+        self.computePriceRange(self.btcusdSeries.getOhlcv(),
+            self.ethusdSeries.getOhlcv())
+        self.computePriceDelta(self.btcusdSeries.getOhlcv(),
+            self.ethusdSeries.getOhlcv())
+
+        btcusdTuple = ( btcusdTimes, btcusdOhlcv[CLOSE],
+                        self.btcusdRange, self.btcusdDelta, btcusdOhlcv)
+        ethusdTuple = ( ethusdTimes, ethusdOhlcv[CLOSE],
+                        self.ethusdRange, self.ethusdDelta, ethusdOhlcv)
 
         return [btcusdTuple, ethusdTuple]
 
-    # Separates trade history data into relevant lists for further computations
+    # Returns times and OHLCV of the last chartMinutes, from the rolling
+    # window if it covers them, otherwise from the store at the finest
+    # level that keeps the chart small
     ############################################################################
-    def separateData(self):
-        self.btcusdTimes = [int(item['time']) for item in self.btcusdData]
-        #self.btcusdOpens = [float(item['open']) for item in self.btcusdData]
-        self.btcusdCloses = [float(item['close']) for item in self.btcusdData]
-        self.btcusdHighs = [float(item['high']) for item in self.btcusdData]
-        self.btcusdLows = [float(item['low']) for item in self.btcusdData]
-
-        self.ethusdTimes = [int(item['time']) for item in self.ethusdData]
-        #self.ethusdOpens = [float(item['open']) for item in self.ethusdData]
-        self.ethusdCloses = [float(item['close']) for item in self.ethusdData]
-        self.ethusdHighs = [float(item['high']) for item in self.ethusdData]
-        self.ethusdLows = [float(item['low']) for item in self.ethusdData]
+    def getChartBars(self, series, store):
+        end = series.lastTime()
+        if self.chartMinutes <= self.minutes or end is None:
+            return series.getTimes(), series.getOhlcv()
+
+        return store.getRange(end - self.chartMinutes * 60, end)
 
     # Calculates the price range during time period
     ############################################################################
-    def computePriceRange(self):
-        btcusdMaxHigh = max(self.btcusdHighs)
-        btcusdMinLow = min(self.btcusdLows)
+    def computePriceRange(self, btcusdOhlcv, ethusdOhlcv):
+        btcusdMaxHigh = btcusdOhlcv[HIGH].max()
+        btcusdMinLow = btcusdOhlcv[LOW].min()
         self.btcusdRange = ('${:,.2f}'.format(btcusdMinLow)
                             + ' - '
                             + '${:,.2f}'.format(btcusdMaxHigh))
 
-        ethusdMaxHigh = max(self.ethusdHighs)
-        ethusdMinLow = min(self.ethusdLows)
+        ethusdMaxHigh = ethusdOhlcv[HIGH].max()
+        ethusdMinLow = ethusdOhlcv[LOW].min()
         self.ethusdRange = ('${:,.2f}'.format(ethusdMinLow)
                             + ' - '
                             + '${:,.2f}'.format(ethusdMaxHigh))
 
     # Calculates the change from current price, x-hours ago
     ############################################################################
-    def computePriceDelta(self):
-        self.btcusdDelta = (float(self.btcusdData[-1]['open'])
-                            - float(self.btcusdData[0]['open']))
-
-        self.ethusdDelta = (float(self.ethusdData[-1]['open'])
-                            - float(self.ethusdData[0]['open']))
+    def computePriceDelta(self, btcusdOhlcv, ethusdOhlcv):
+        btcusdOpens = btcusdOhlcv[OPEN]
+        ethusdOpens = ethusdOhlcv[OPEN]
+        self.btcusdDelta = float(btcusdOpens[-1] - btcusdOpens[0])
+        self.ethusdDelta = float(ethusdOpens[-1] - ethusdOpens[0])
 
         # Use format ($100) for negative price
         if self.btcusdDelta < 0:
@@ -0,0 +1,89 @@
+################################################################################
+#                                                                              #
+#  Downsample.py                                                               #
+#  Author: Cody Johnson <codyj@protonmail.com>                                 #
+#                                                                              #
+################################################################################
+
+# Largest-Triangle-Three-Buckets downsampling. A series is cut into buckets
+# and from each bucket the point forming the largest triangle with the point
+# kept before it and the average of the next bucket is kept. Peaks and dips
+# survive, so a line of about one point per pixel looks like the full line.
+
+from collections import OrderedDict
+import numpy as np
+
+# Reduces x, y to threshold points, returns them unchanged if already fewer
+################################################################################
+def lttb(x, y, threshold):
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    # First and last points are always kept, the rest are split in buckets
+    every = (n - 2) / (threshold - 2)
+    edges = np.empty(threshold, dtype=np.int64)
+    edges[:-1] = (np.arange(threshold - 1) * every).astype(np.int64) + 1
+    edges[-1] = n
+
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0] = 0
+    keep[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # Average of the next bucket, the last point for the last bucket
+        nextEnd = edges[i + 2]
+        xc = x[end:nextEnd].mean()
+        yc = y[end:nextEnd].mean()
+
+        # Twice the triangle area for every point in this bucket
+        xa, ya = x[a], y[a]
+        area = np.abs((xa - xc) * (y[start:end] - ya)
+            - (xa - x[start:end]) * (yc - ya))
+        a = start + int(area.argmax())
+        keep[i + 1] = a
+
+    return x[keep], y[keep]
+
+
+class DownsampleCache:
+    # Class data
+    x = None                # Full resolution x values
+    y = None                # Full resolution y values
+    levels = OrderedDict()  # Downsampled (x, y) per point count
+    levelStep = 64          # Point counts round up to this, one level each
+    maxLevels = 8           # Levels kept before the oldest is dropped
+
+    # Initializer
+    def __init__(self, levelStep=64, maxLevels=8):
+        self.levelStep = levelStep
+        self.maxLevels = maxLevels
+        self.levels = OrderedDict()
+
+    # Replaces the series, dropping all cached levels
+    ############################################################################
+    def setData(self, x, y):
+        self.x = x
+        self.y = y
+        self.levels.clear()
+
+    # Returns the series reduced to about points, computed once per level
+    ############################################################################
+    def get(self, points):
+        if self.x is None:
+            return np.empty(0), np.empty(0)
+
+        level = -(-max(points, 1) // self.levelStep) * self.levelStep
+        if level >= len(self.x):
+            return self.x, self.y
+
+        if level in self.levels:
+            self.levels.move_to_end(level)
+        else:
+            self.levels[level] = lttb(self.x, self.y, level)
+            if len(self.levels) > self.maxLevels:
+                self.levels.popitem(last=False)
+        return self.levels[level]
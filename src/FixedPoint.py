@@ -0,0 +1,67 @@
+################################################################################
+#                                                                              #
+#  FixedPoint.py                                                               #
+#  Author: Cody Johnson <codyj@protonmail.com>                                 #
+#                                                                              #
+################################################################################
+
+# Exact decimal prices and amounts as integers. A FixedPoint is a scale, a
+# number of decimals usually taken from a symbol's quote increment or tick
+# size; values are plain Python ints counting units of that scale. They are
+# unbounded, so refining to a finer scale can never overflow.
+# Parsing and formatting work on the digits directly, never through float,
+# so sorting, sums and differences are exact. A value with more significant
+# decimals than the scale holds is rejected rather than truncated.
+
+from decimal import Decimal
+
+class FixedPoint:
+    # Class data
+    decimals = 8            # Digits after the decimal point
+    factor = 10 ** 8        # Units per whole number
+    zeros = '0' * 8         # Padding for short fractions
+
+    # Initializer
+    def __init__(self, decimals=8):
+        self.decimals = decimals
+        self.factor = 10 ** decimals
+        self.zeros = '0' * decimals
+
+    # Returns the value of a decimal string, raises ValueError if it has
+    # non-zero digits beyond the scale
+    ############################################################################
+    def parse(self, text):
+        if not isinstance(text, str):
+            text = str(text)
+        if 'e' in text or 'E' in text:
+            text = format(Decimal(text), 'f')
+
+        whole, dot, fraction = text.partition('.')
+        if fraction[self.decimals:].strip('0'):
+            raise ValueError(text + ' has more than ' + str(self.decimals)
+                + ' decimals')
+        return int(whole + (fraction + self.zeros)[:self.decimals])
+
+    # Returns value as a decimal string, rounded half up to decimals if fewer
+    ############################################################################
+    def format(self, value, decimals=None):
+        factor = self.factor
+        if decimals is None or decimals >= self.decimals:
+            decimals = self.decimals
+        else:
+            step = 10 ** (self.decimals - decimals)
+            value = (abs(value) + step // 2) // step * (-1 if value < 0 else 1)
+            factor = 10 ** decimals
+
+        sign = '-' if value < 0 else ''
+        whole, fraction = divmod(abs(int(value)), factor)
+        if not decimals:
+            return sign + str(whole)
+        return sign + str(whole) + '.' + str(fraction).zfill(decimals)
+
+
+# Returns the scale of an increment such as '0.01' or 1e-08
+################################################################################
+def fromIncrement(increment):
+    exponent = Decimal(str(increment)).normalize().as_tuple().exponent
+    return FixedPoint(max(0, -exponent))
@@ -0,0 +1,189 @@
+################################################################################
+#                                                                              #
+#  GeminiMarketData.py                                                         #
+#  Author: Cody Johnson <codyj@protonmail.com>                                 #
+#                                                                              #
+################################################################################
+
+# https://docs.gemini.com/websocket-api/#market-data-version-2
+
+import json, threading, time, websocket
+from OrderBook import OrderBook
+from Records import Ticker
+from SymbolCache import getSymbolCache
+from ConnectivityMonitor import getConnectivityMonitor
+
+class GeminiMarketData:
+    # Class data
+    wsUrl = ''
+    symbols = []            # Subscribed symbols: ["btcusd", "ethusd"]
+    onTicker = None         # Callback(symbol, ticker) for ticker updates
+    onStatus = None         # Callback(bool) for stream connection status
+    books = {}              # OrderBook per symbol
+    lastPrices = {}         # Last trade price per symbol
+    tickers = {}            # Last published ticker per symbol
+    ws = None               # WebSocketApp for the current connection
+    thread = None           # Thread running the reconnect loop
+    connected = False       # True while the stream is subscribed
+    stopped = False         # Flag to stop reconnecting
+    minBackoff = 1.0        # Seconds to wait before first reconnect
+    maxBackoff = 60.0       # Upper bound for reconnect delay
+
+    # Initializer
+    def __init__(self, symbols, onTicker, onStatus=None, isSandbox=False):
+        if isSandbox:
+            self.wsUrl = 'wss://api.sandbox.gemini.com/v2/marketdata'
+        else:
+            self.wsUrl = 'wss://api.gemini.com/v2/marketdata'
+
+        self.symbols = [symbol.lower() for symbol in symbols]
+        self.onTicker = onTicker
+        self.onStatus = onStatus
+        self.books = {symbol: OrderBook(symbol,
+            *getSymbolCache().getScales(symbol)) for symbol in self.symbols}
+        self.lastPrices = {}
+        self.tickers = {}
+        self.lock = threading.Lock()
+
+    # Starts the stream in a background thread
+    ############################################################################
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+
+        self.stopped = False
+        self.thread = threading.Thread(target=self.run, args=())
+        self.thread.daemon = True
+        self.thread.start()
+
+    # Stops the stream and the reconnect loop
+    ############################################################################
+    def stop(self):
+        self.stopped = True
+        if self.ws:
+            self.ws.close()
+
+    # Returns the live order book for symbol
+    ############################################################################
+    def getBook(self, symbol):
+        return self.books.get(symbol.lower())
+
+    # Returns True while the stream is delivering data
+    ############################################################################
+    def isConnected(self):
+        return self.connected
+
+    # Connects and reconnects with exponential backoff until stopped
+    ############################################################################
+    def run(self):
+        backoff = self.minBackoff
+
+        while not self.stopped:
+            self.ws = websocket.WebSocketApp(self.wsUrl,
+                on_open=self.handleOpen,
+                on_message=self.handleMessage,
+                on_error=self.handleError,
+                on_close=self.handleClose)
+
+            startTime = time.time()
+            self.ws.run_forever(ping_interval=20, ping_timeout=10)
+            self.setConnected(False)
+
+            if self.stopped:
+                break
+
+            # Reset backoff if the connection stayed up for a while
+            if time.time() - startTime > self.maxBackoff:
+                backoff = self.minBackoff
+
+            time.sleep(backoff)
+            backoff = min(backoff * 2, self.maxBackoff)
+
+    # Subscribes to level 2 data for all symbols on one connection
+    ############################################################################
+    def handleOpen(self, ws):
+        # First update per symbol after subscribing is a full snapshot
+        for book in self.books.values():
+            book.clear()
+
+        subscription = {
+            'type': 'subscribe',
+            'subscriptions': [{
+                'name': 'l2',
+                'symbols': [symbol.upper() for symbol in self.symbols]
+            }]
+        }
+        ws.send(json.dumps(subscription))
+
+    # Dispatches stream messages
+    ############################################################################
+    def handleMessage(self, ws, message):
+        getConnectivityMonitor().reportSuccess()
+
+        data = json.loads(message)
+        msgType = data.get('type')
+
+        if msgType == 'l2_updates':
+            symbol = data['symbol'].lower()
+            self.applyChanges(symbol, data.get('changes', []))
+
+            # Initial snapshot carries the most recent trades
+            for trade in data.get('trades', []):
+                self.applyTrade(symbol, trade)
+
+            self.setConnected(True)
+            self.publish(symbol)
+        elif msgType == 'trade':
+            symbol = data['symbol'].lower()
+            self.applyTrade(symbol, data)
+            self.publish(symbol)
+
+    # Logs stream errors, run() takes care of reconnecting
+    ############################################################################
+    def handleError(self, ws, error):
+        print('Market data error: ' + str(error))
+
+    # Marks stream as down when the socket closes
+    ############################################################################
+    def handleClose(self, ws, statusCode=None, message=None):
+        self.setConnected(False)
+
+    # Updates connection status and notifies listener on change
+    ############################################################################
+    def setConnected(self, status):
+        if status == self.connected:
+            return
+
+        self.connected = status
+        if self.onStatus:
+            self.onStatus(status)
+
+    # Applies level changes: [side, price, quantity]
+    ############################################################################
+    def applyChanges(self, symbol, changes):
+        book = self.books.get(symbol)
+        if book:
+            book.applyChanges(changes)
+
+    # Stores last trade price
+    ############################################################################
+    def applyTrade(self, symbol, trade):
+        with self.lock:
+            self.lastPrices[symbol] = trade.get('price', '')
+
+    # Sends ticker to listener if top of book or last price changed
+    ############################################################################
+    def publish(self, symbol):
+        book = self.books.get(symbol)
+        if not book:
+            return
+
+        with self.lock:
+            ticker = Ticker(book.bestBid(), book.bestAsk(),
+                self.lastPrices.get(symbol, ''))
+
+            if self.tickers.get(symbol) == ticker:
+                return
+            self.tickers[symbol] = ticker
+
+        self.onTicker(symbol, ticker)
@@ -8,13 +8,17 @@
 # https://docs.gemini.com/websocket-api/#order-events
 # https://docs.gemini.com/rest-api/#private-api-invocation
 
-import json, datetime, urllib, time, base64, hmac, hashlib, requests
+import json, datetime, urllib, time, base64, hmac, hashlib
 from hashlib import sha384
-from urllib.request import urlopen
+from HttpTransport import getTransport
+from RateLimiter import getRateLimiter, PRIORITY_ACCOUNT
+from Resilience import getResilience
+from Records import Trade, Balance
 
 class GeminiPrivateAPI:
     # Class data
     baseUrl = ''
+    transport = None        # Shared pooled HTTP transport
     account = {}            # Account data
     #balances = []           # List of balance info from Gemini
     #trades = []             # List of trades info from Gemini
@@ -23,6 +27,7 @@ class GeminiPrivateAPI:
     # Initializer
     def __init__(self, account):
         self.account = account
+        self.transport = getTransport()
 
         if self.account['isSandbox']:
             self.baseUrl = 'https://api.sandbox.gemini.com/v1/'
@@ -31,7 +36,7 @@ class GeminiPrivateAPI:
 
     # Generates b64-encoded payload
     ############################################################################
-    def generatePayload(self, request, symbol=None):
+    def generatePayload(self, request, symbol=None, params=None):
         nonce = int(round(time.time()*1000))
         apiKey = self.account.get('apiKey')
         secret = self.account.get('secretKey')
@@ -48,6 +53,10 @@ class GeminiPrivateAPI:
                 'symbol': symbol
             }
 
+        # Endpoint options such as timestamp and limit_trades
+        if params:
+            payload.update(params)
+
         return base64.b64encode(str.encode(json.dumps(payload)))
 
     # Generates signature
@@ -72,34 +81,44 @@ class GeminiPrivateAPI:
         }
         return headers
 
-    # Receive balances from Gemini
+    # Sends a signed request, retries get a fresh nonce and signature
     ############################################################################
-    def getBalances(self):
-        baseUrl = self.baseUrl + 'balances'
-        b64Payload = self.generatePayload('/v1/balances')
-        signature = self.generateSignature(b64Payload)
-        headers = self.generateHeaders(b64Payload, signature)
+    def sendRequest(self, endpoint, symbol=None, priority=PRIORITY_ACCOUNT,
+            params=None):
+        def send():
+            getRateLimiter().acquire('private', endpoint, priority)
+            b64Payload = self.generatePayload('/v1/' + endpoint, symbol,
+                params)
+            signature = self.generateSignature(b64Payload)
+            headers = self.generateHeaders(b64Payload, signature)
+
+            return self.transport.postJson(self.baseUrl + endpoint,
+                headers=headers)
 
-        response = requests.request("POST", baseUrl, headers=headers)
-        response = json.loads(response.text)
+        return getResilience().call(endpoint, send)
+
+    # Receive balances from Gemini as a list of Balance
+    ############################################################################
+    def getBalances(self):
+        response = self.sendRequest('balances')
         if self.validResponse(response):
-            return response
+            return [Balance.fromJson(item) for item in response]
         else:
             return self.error
 
-    # Get past trades
+    # Get past trades as a list of Trade, only those at or after timestamp
+    # (ms) if given, at most limitTrades if given
     ############################################################################
-    def getTrades(self, symbol):
-        baseUrl = self.baseUrl + 'mytrades'
-        b64Payload = self.generatePayload('/v1/mytrades', symbol)
-        signature = self.generateSignature(b64Payload)
-        headers = self.generateHeaders(b64Payload, signature)
-
-        response = requests.request("POST", baseUrl, headers=headers)
-        response = json.loads(response.text)
+    def getTrades(self, symbol, timestamp=None, limitTrades=None):
+        params = {}
+        if timestamp is not None:
+            params['timestamp'] = timestamp
+        if limitTrades is not None:
+            params['limit_trades'] = limitTrades
+
+        response = self.sendRequest('mytrades', symbol, params=params)
         if self.validResponse(response):
-            self.trades = response
-            return response
+            return [Trade.fromJson(item, symbol) for item in response]
         else:
             return self.error
 
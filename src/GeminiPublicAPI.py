@@ -8,44 +8,58 @@
 # https://docs.gemini.com/websocket-api/#market-data
 
 import json, datetime, urllib, websocket
-from urllib.request import urlopen
+from concurrent.futures import ThreadPoolExecutor
+from HttpTransport import getTransport
+from SymbolCache import getSymbolCache
+from RateLimiter import getRateLimiter
+from Resilience import getResilience
+from Records import Ticker
+
+# Bounded pool shared by all instances for concurrent ticker requests
+tickerExecutor = ThreadPoolExecutor(max_workers=8)
 
 class GeminiPublicAPI:
     # Class data
     baseUrl = ''
+    transport = None    # Shared pooled HTTP transport
     symbols = []        # List of symbols: ["btcusd", "ethusd", "ethbtc"]
 
     # Initializer
     def __init__(self):
         self.baseUrl = 'https://api.gemini.com/v1/'
+        self.transport = getTransport()
         self.getSymbols()
 
-    # Updates ticker data
+    # Fetches tickers for symbols concurrently, keyed by symbol
+    ############################################################################
+    def getTickers(self, symbols=None):
+        if symbols is None:
+            symbols = self.symbols
+        symbols = [s for s in symbols if s in self.symbols]
+
+        futures = {}
+        for symbol in symbols:
+            futures[symbol] = tickerExecutor.submit(self.getTicker, symbol)
+
+        tickers = {}
+        for symbol, future in futures.items():
+            try:
+                tickers[symbol] = future.result()
+            except Exception as err:
+                print('Ticker error for ' + symbol + ': ' + str(err))
+
+        return tickers
+
+    # Fetches a Ticker for one symbol
     ############################################################################
-    def getTickers(self):
-        btcusdTicker = {}   # btcusd ticker data
-        ethusdTicker = {}   # ethusd ticker data
-
-        for symbol in self.symbols:
-            if symbol == 'btcusd':
-                postUrl = "/pubticker/btcusd"
-                response = urlopen(self.baseUrl + postUrl)
-                btcusdTicker = json.loads(response.read())
-            elif symbol == 'ethusd':
-                postUrl = "/pubticker/ethusd"
-                response = urlopen(self.baseUrl + postUrl)
-                ethusdTicker = json.loads(response.read())
-            #elif symbol == 'ethbtc':
-                #postUrl = "/pubticker/ethbtc"
-                #response = urlopen(self.baseUrl + postUrl)
-                #self.tickers[2] = json.loads(response.read())
-            else:
-                continue
-
-        return [btcusdTicker, ethusdTicker]
-
-    # Gets symbol list from Gemini
+    def getTicker(self, symbol):
+        def fetch():
+            getRateLimiter().acquire('public', 'pubticker')
+            return self.transport.getJson(self.baseUrl + 'pubticker/' + symbol)
+
+        return Ticker.fromJson(getResilience().call('pubticker', fetch))
+
+    # Gets symbol list from the symbol cache
     ############################################################################
     def getSymbols(self):
-        response = urlopen(self.baseUrl + '/symbols')
-        self.symbols = json.loads(response.read())
+        self.symbols = getSymbolCache().getSymbols()
@@ -0,0 +1,138 @@
+################################################################################
+#                                                                              #
+#  HttpTransport.py                                                            #
+#  Author: Cody Johnson <codyj@protonmail.com>                                 #
+#                                                                              #
+################################################################################
+
+# Shared HTTP transport. One requests.Session keeps a keep-alive connection
+# pool per host, so repeated polls reuse TCP+TLS connections instead of
+# handshaking on every request.
+
+import json, threading, time, requests
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from ConnectivityMonitor import getConnectivityMonitor
+
+class HttpTransport:
+    # Class data
+    session = None          # Session holding the connection pools
+    poolConnections = 4     # Number of per-host pools to keep
+    poolMaxSize = 8         # Connections kept alive per host
+    connectTimeout = 3.05   # Seconds to establish a connection
+    readTimeout = 10.0      # Seconds to wait for a response
+    timings = {}            # Request timing per endpoint
+
+    # Initializer
+    def __init__(self, poolConnections=4, poolMaxSize=8, connectTimeout=3.05,
+            readTimeout=10.0):
+        self.poolConnections = poolConnections
+        self.poolMaxSize = poolMaxSize
+        self.connectTimeout = connectTimeout
+        self.readTimeout = readTimeout
+        self.timings = {}
+        self.lock = threading.Lock()
+
+        adapter = HTTPAdapter(pool_connections=poolConnections,
+            pool_maxsize=poolMaxSize)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    # Sends a request over the pooled session and records its timing.
+    # Whether the server was reached is reported to the connectivity monitor.
+    ############################################################################
+    def request(self, method, url, headers=None, params=None, timeout=None):
+        if timeout is None:
+            timeout = (self.connectTimeout, self.readTimeout)
+
+        monitor = getConnectivityMonitor()
+        startTime = time.perf_counter()
+        try:
+            response = self.session.request(method, url, headers=headers,
+                params=params, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout):
+            monitor.reportFailure()
+            raise
+        finally:
+            self.recordTiming(url, time.perf_counter() - startTime)
+
+        monitor.reportSuccess()
+        return response
+
+    # Sends a GET request and returns decoded JSON
+    ############################################################################
+    def getJson(self, url, headers=None, params=None, timeout=None):
+        response = self.request('GET', url, headers, params, timeout)
+        return self.decode(response)
+
+    # Sends a POST request and returns decoded JSON
+    ############################################################################
+    def postJson(self, url, headers=None, params=None, timeout=None):
+        response = self.request('POST', url, headers, params, timeout)
+        return self.decode(response)
+
+    # Decodes JSON body. Rate limiting and server errors raise HTTPError,
+    # other error statuses carry a JSON reason for the caller to handle.
+    ############################################################################
+    def decode(self, response):
+        if response.status_code == 429 or response.status_code >= 500:
+            response.raise_for_status()
+
+        return json.loads(response.text)
+
+    # Adds elapsed seconds to the stats for the url's endpoint
+    ############################################################################
+    def recordTiming(self, url, elapsed):
+        parts = urlsplit(url)
+        endpoint = parts.netloc + parts.path
+
+        with self.lock:
+            stats = self.timings.setdefault(endpoint, {'count': 0,
+                'total': 0.0, 'max': 0.0, 'last': 0.0})
+            stats['count'] += 1
+            stats['total'] += elapsed
+            stats['max'] = max(stats['max'], elapsed)
+            stats['last'] = elapsed
+
+    # Returns a copy of the timing stats, with average seconds per endpoint
+    ############################################################################
+    def getTimings(self):
+        with self.lock:
+            timings = {}
+            for endpoint, stats in self.timings.items():
+                timings[endpoint] = dict(stats)
+                timings[endpoint]['average'] = stats['total'] / stats['count']
+            return timings
+
+    # Closes all pooled connections
+    ############################################################################
+    def close(self):
+        self.session.close()
+
+
+# Shared transport instance
+################################################################################
+transport = None
+transportLock = threading.Lock()
+
+# Returns the process-wide transport, creating it on first use
+################################################################################
+def getTransport():
+    global transport
+
+    with transportLock:
+        if transport is None:
+            transport = HttpTransport()
+        return transport
+
+# Replaces the process-wide transport with one using the given options
+################################################################################
+def configureTransport(**options):
+    global transport
+
+    with transportLock:
+        if transport is not None:
+            transport.close()
+        transport = HttpTransport(**options)
+        return transport
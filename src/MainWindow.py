@@ -11,9 +11,10 @@ from datetime import datetime as dt
 from urllib.request import urlopen
 from urllib.error import URLError
 from PyQt5 import uic, QtGui, QtWidgets
-from PyQt5.QtGui import QPixmap, QStandardItemModel, QStandardItem, QFontDatabase
+from PyQt5.QtGui import QPixmap, QFontDatabase
 from PyQt5.QtWidgets import QLabel, QPushButton, QMessageBox, QFileDialog
-from PyQt5.QtCore import pyqtSlot, pyqtSignal
+from PyQt5.QtWidgets import QHeaderView
+from PyQt5.QtCore import Qt, QEvent, pyqtSlot, pyqtSignal
 from ui_MainWindow import Ui_MainWindow
 from AccountsDialog import AccountsDialog
 from EncryptDialog import EncryptDialog
@@ -31,15 +32,22 @@ from EncryptDecryptData import *
 from LoadSaveData import *
 from GeminiPublicAPI import *
 from GeminiPrivateAPI import *
+from GeminiMarketData import *
 from CryptoCompareAPI import *
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
-import matplotlib.pyplot as plt
-import matplotlib.dates as md
+from HttpTransport import getTransport, configureTransport
+from Scheduler import Scheduler
+from ConnectivityMonitor import getConnectivityMonitor
+from SymbolCache import getSymbolCache
+from NativePriceChart import NativePriceChart
+from ChartRenderer import ChartRenderer, ChartView
+from UiUpdateBus import UiUpdateBus
+from TradesTableModel import TradesTableModel, TIME
+from TradeStore import TradeStore
 
 class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
     # Create signals
     netStatusSignal = pyqtSignal(bool)
+    streamStatusSignal = pyqtSignal(bool)
 
     # Class data
     connectIcon = None      # QPixmap for connection icon in status bar
@@ -49,34 +57,39 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
     accountsPath = ''       # Path of Accounts file
     settings = {}           # Loaded settings
     settingsPath = ''       # Path of Settings file
+    watchedSymbols = []     # Symbols streamed and shown in the order book
     password = ''           # Password in plaintext (never saved)
     internetUp = False      # Internet connection status
     connected = False       # True if connected to Gemini exchange
-    tickerThread = None     # Thread for updating tickers
-    plotThread = None       # Thread for updating plots
-    tradesThread = None     # Thread for updating trades
-    balancesThread = None   # Thread for updating balances
-    tradesModel = None      # Item model for tradesListView
+    scheduler = None        # Runs the polling jobs
+    pollInterval = 15       # Seconds between polls of each data source
+    idlePollInterval = 60   # Seconds between polls while unfocused or hidden
+    marketData = None       # Streaming market data from Gemini
+    tradesModel = None      # Trade blotter model for tradesTableView
+    tradeStore = None       # Local copy of the account's trades
+    uiBus = None            # Applies worker updates on the GUI thread
+    cryptoCompare = None    # Rolling trade history from CryptoCompare
+    chartRenderer = None    # Rasterizes charts off the GUI thread
 
     # Initializer
     def __init__(self):
         super(MainWindow, self).__init__()
         self.initUI()
 
-        # Create graph widgets
-        self.btcFigure = plt.figure()
-        self.btcCanvas = FigureCanvas(self.btcFigure)
-        self.ethFigure = plt.figure()
-        self.ethCanvas = FigureCanvas(self.ethFigure)
+        # Create graph widgets, charts are rendered off the GUI thread
+        self.btcCanvas = ChartView(self)
+        self.ethCanvas = ChartView(self)
         self.btcLayout.addWidget(self.btcCanvas)
         self.ethLayout.addWidget(self.ethCanvas)
+        self.chartRenderer = ChartRenderer()
 
         self.startUp()
+        self.chartRenderer.start()
 
-        # Start threads
-        self.internetThread.start()
-        self.tickerThread.start()
-        self.plotThread.start()
+        # Start connectivity monitor, polling jobs and market data stream
+        getConnectivityMonitor().start()
+        self.scheduler.start()
+        self.marketData.start()
 
     # Initialize UI
     def initUI(self):
@@ -84,11 +97,22 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
 
         # Set fixed-width font for list views
         fixedFont = QFontDatabase.systemFont(1)
-        self.tradesListView.setFont(fixedFont)
+        self.tradesTableView.setFont(fixedFont)
+
+        # Worker threads post GUI changes here, applied once per frame
+        self.uiBus = UiUpdateBus(self)
 
         # Setup models
-        self.tradesModel = QStandardItemModel(self.tradesListView)
-        self.tradesListView.setModel(self.tradesModel)
+        self.tradesModel = TradesTableModel(parent=self.tradesTableView)
+        self.tradesTableView.setModel(self.tradesModel)
+
+        # Fixed row heights let the view skip measuring off-screen rows
+        rowHeader = self.tradesTableView.verticalHeader()
+        rowHeader.setSectionResizeMode(QHeaderView.Fixed)
+        rowHeader.hide()
+        self.tradesTableView.horizontalHeader().setStretchLastSection(True)
+        self.tradesTableView.setSortingEnabled(True)
+        self.tradesTableView.sortByColumn(TIME, Qt.DescendingOrder)
 
         # Status Bar
         self.statusBar.showMessage('Gemini CryptoTrader started...')
@@ -117,10 +141,15 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
         self.aboutAction.triggered.connect(self.openAboutDialog)
 
         # Connect buttons
-        self.connectButton.clicked.connect(self.startPrivateThreads)
+        self.connectButton.clicked.connect(self.startPrivateJobs)
 
         # Connect custom signals
         self.netStatusSignal.connect(self.updateInternetStatus)
+        self.streamStatusSignal.connect(self.updateStreamStatus)
+
+        # Poll and render less while the charts cannot be seen
+        self.mainTabWidget.currentChanged.connect(self.updateActivity)
+        self.currencyTabWidget.currentChanged.connect(self.updateActivity)
 
     # Run start up processes
     ############################################################################
@@ -130,6 +159,23 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
         if self.settings['encrypted']:
             self.openPasswordDialog()
 
+        # Pool sizes and timeouts for the shared HTTP transport
+        if 'transport' in self.settings:
+            configureTransport(**self.settings['transport'])
+
+        # Charts depend on the chartBackend setting
+        self.btcChart = self.createChart()
+        self.ethChart = self.createChart()
+        self.chartRenderer.addChart(self.btcChart, self.btcCanvas)
+        self.chartRenderer.addChart(self.ethChart, self.ethCanvas)
+
+        # Serve symbol details from disk, refresh in background when stale
+        self.watchedSymbols = self.settings.get('symbols',
+            ['btcusd', 'ethusd', 'ethbtc'])
+        symbolCache = getSymbolCache()
+        symbolCache.ttl = self.settings.get('symbolCacheTtl', symbolCache.ttl)
+        symbolCache.prefetch(self.watchedSymbols)
+
         # Load accounts, last used account and update enabled actions
         self.accounts, self.accountsPath = loadAccounts(self.settings,
             self.password)
@@ -137,19 +183,36 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
             self.account = getLastUsedAccount(self.accounts)
         self.updateEnabledActions()
 
-        # Build threads
-        self.internetThread = threading.Thread(target=self.checkInternet,
-            args=())
-        self.internetThread.daemon = True
-        self.tickerThread = threading.Thread(target=self.tickerLoop, args=())
-        self.tickerThread.daemon = True
-        self.plotThread = threading.Thread(target=self.plotLoop, args=())
-        self.plotThread.daemon = True
-        self.tradesThread = threading.Thread(target=self.tradesLoop, args=())
-        self.tradesThread.daemon = True
-        self.balancesThread = threading.Thread(target=self.balancesLoop,
-            args=())
-        self.balancesThread.daemon = True
+        # Link state comes from real requests, probe only when idle
+        monitor = getConnectivityMonitor()
+        monitor.probe = self.probeExchange
+        monitor.addListener(self.netStatusSignal.emit)
+
+        # Build public jobs, network jobs are held while offline
+        self.scheduler = Scheduler(isOnline=monitor.isOnline)
+        monitor.addListener(lambda status: self.scheduler.wake())
+        self.scheduler.addJob('ticker', self.pollTickers, self.pollInterval,
+            jitter=1.0, requiresNetwork=True)
+        self.scheduler.addJob('plot', self.pollTradeHistory,
+            self.pollInterval, jitter=1.0, requiresNetwork=True)
+
+        # Build market data stream, pollTickers runs only while it is down
+        self.marketData = GeminiMarketData(self.watchedSymbols,
+            self.postStreamTicker, self.streamStatusSignal.emit)
+
+    # Returns a native chart, or a matplotlib chart if chosen in settings,
+    # showing the chartMode setting: 'line', 'candles' or 'volumes'
+    ############################################################################
+    def createChart(self):
+        if self.settings.get('chartBackend', 'native') == 'matplotlib':
+            # Imported only when chosen, matplotlib is slow to load
+            from PriceChart import PriceChart
+            chart = PriceChart()
+        else:
+            chart = NativePriceChart()
+
+        chart.setMode(self.settings.get('chartMode', 'line'))
+        return chart
 
     # Load settings from user-specified file
     ############################################################################
@@ -182,19 +245,103 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
         saveAccounts(self.accounts, self.accountsPath, self.settings,
             self.password, userSave=True)
 
-    # Starts private threads
+    # Starts private jobs, connecting again restarts them
     ############################################################################
     @pyqtSlot()
-    def startPrivateThreads(self):
+    def startPrivateJobs(self):
+        # Stored trades are shown right away, polls only fetch new ones
+        self.openTradeStore()
+
         if self.internetUp:
-            self.tradesThread.start()
-            self.balancesThread.start()
+            self.scheduler.addJob('trades', self.pollTrades, self.pollInterval,
+                jitter=1.0, requiresNetwork=True)
+            self.scheduler.addJob('balances', self.pollBalances,
+                self.pollInterval, jitter=1.0, requiresNetwork=True)
+            self.updateActivity()
         else:
             print('No internet detected. Check connection.')
 
+    # Opens the current account's trade store, reusing the open one if it
+    # is the same account, and loads its btcusd trades in the background
+    ############################################################################
+    def openTradeStore(self):
+        if self.tradeStore is None or not self.tradeStore.isFor(self.account):
+            if self.tradeStore:
+                self.tradeStore.close()
+            self.tradeStore = TradeStore(self.account)
+
+        self.tradesModel.clear()
+        thread = threading.Thread(target=self.loadStoredTrades,
+            args=(self.tradeStore,))
+        thread.daemon = True
+        thread.start()
+
+    # Sends the btcusd trades in store the blotter lacks, any thread
+    ############################################################################
+    def loadStoredTrades(self, store):
+        # The store is replaced when connecting with another account
+        if store is not self.tradeStore:
+            return
+
+        trades = store.getTrades('btcusd',
+            start=self.tradesModel.newestTimestamp)
+        self.uiBus.post('tradesAppend', self.updateTradeGUI, store, trades)
+
+    # Adapts polling and rendering when the window is minimized, shown,
+    # focused or loses focus
+    ############################################################################
+    def changeEvent(self, event):
+        super(MainWindow, self).changeEvent(event)
+        if event.type() in (QEvent.WindowStateChange, QEvent.ActivationChange):
+            self.updateActivity()
+
+    # Adapts polling and rendering once the window is first shown
+    ############################################################################
+    def showEvent(self, event):
+        super(MainWindow, self).showEvent(event)
+        self.updateActivity()
+
+    # Renders only visible charts, polls at full rate only while focused
+    ############################################################################
+    def updateActivity(self, *args):
+        if self.scheduler is None:
+            return
+
+        minimized = self.isMinimized()
+        focused = self.isActiveWindow() and not minimized
+
+        # Hidden tabs and minimized windows keep their last frame
+        btcShown = self.btcCanvas.isVisible() and not minimized
+        ethShown = self.ethCanvas.isVisible() and not minimized
+        self.chartRenderer.setVisible(self.btcChart, btcShown)
+        self.chartRenderer.setVisible(self.ethChart, ethShown)
+
+        self.setJobRate('ticker', focused)
+        self.setJobRate('plot', focused and (btcShown or ethShown))
+        self.setJobRate('trades', focused)
+        self.setJobRate('balances', focused)
+
+    # Switches a job between full and idle rate, catching up when it speeds up
+    ############################################################################
+    def setJobRate(self, name, realtime):
+        interval = self.pollInterval if realtime else self.idlePollInterval
+        current = self.scheduler.getInterval(name)
+        if current is None or current == interval:
+            return
+
+        self.scheduler.setInterval(name, interval)
+        if realtime:
+            self.scheduler.runNow(name)
+
     # When user closes program, save all data & encrypt if necessary
     ############################################################################
     def closeEvent(self, event):
+        # Stop polling jobs, rendering, market data and connectivity monitor
+        self.scheduler.stop()
+        self.chartRenderer.stop()
+        self.marketData.stop()
+        getConnectivityMonitor().stop()
+
         # Save data
         saveAccounts(self.accounts, self.accountsPath,
             self.settings, self.password)
@@ -326,7 +473,7 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
     ############################################################################
     @pyqtSlot()
     def openOrderBookDialog(self):
-        obd = OrderBookDialog(self)
+        obd = OrderBookDialog(self, self.marketData)
         obd.exec_()
 
     # Toggles status bar on or off
@@ -340,19 +487,11 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
             self.statusBar.show()
             self.toggleStatusBarAction.setText('Hide Statusbar')
 
-    # Checks internet connection using Google IP
+    # Sends a cheap request to Gemini, only used when the link is idle
     ############################################################################
-    def checkInternet(self):
-        while True:
-            status = False
-            try:
-                urlopen('http://74.125.21.99', timeout=1)
-                status = True
-            except URLError as err:
-                status = False
-
-            self.netStatusSignal.emit(status)
-            time.sleep(5)
+    def probeExchange(self):
+        getTransport().request('HEAD', 'https://api.gemini.com/v1/symbols',
+            timeout=2)
 
     # Updates internet status
     ############################################################################
@@ -376,219 +515,153 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
     ############################################################################
     def clearAllData(self):
         # Plots
-        self.btcFigure.clear()
-        self.ethFigure.clear()
+        self.chartRenderer.clear(self.btcChart)
+        self.chartRenderer.clear(self.ethChart)
 
         # Ticker
-        self.btcLastPriceLabel.setText('')
-        self.btcDeltaLabel.setText('')
-        self.btcRangeLabel.setText('')
-        self.ethLastPriceLabel.setText('')
-        self.ethDeltaLabel.setText('')
-        self.ethRangeLabel.setText('')
+        self.uiBus.setText(self.btcLastPriceLabel, '')
+        self.uiBus.setText(self.btcDeltaLabel, '')
+        self.uiBus.setText(self.btcRangeLabel, '')
+        self.uiBus.setText(self.ethLastPriceLabel, '')
+        self.uiBus.setText(self.ethDeltaLabel, '')
+        self.uiBus.setText(self.ethRangeLabel, '')
 
         # Balances
-        self.usdBalanceLabel.setText('')
-        self.btcBalanceLabel.setText('')
-        self.ethBalanceLabel.setText('')
+        self.uiBus.setText(self.usdBalanceLabel, '')
+        self.uiBus.setText(self.btcBalanceLabel, '')
+        self.uiBus.setText(self.ethBalanceLabel, '')
 
         # Available for trading
-        self.usdAvailableLabel.setText('')
-        self.btcAvailableLabel.setText('')
-        self.ethAvailableLabel.setText('')
+        self.uiBus.setText(self.usdAvailableLabel, '')
+        self.uiBus.setText(self.btcAvailableLabel, '')
+        self.uiBus.setText(self.ethAvailableLabel, '')
 
-        # Clear list view models
-        self.tradesModel.clear()
+        # Clear list view models, keyed apart from trade appends so a pending
+        # append cannot replace the clear
+        self.uiBus.post('tradesClear', self.tradesModel.clear)
 
 
     # Gets public market data from Gemini
     ############################################################################
-    def tickerLoop(self):
-        while True:
-            if self.internetUp:
-                tickerList = GeminiPublicAPI().getTickers()
-                self.updateTickerGui(tickerList)
-            else:
-                continue
-
-            time.sleep(15)
+    def pollTickers(self):
+        # Fall back to REST only while the stream is down
+        if not self.marketData.isConnected():
+            tickers = GeminiPublicAPI().getTickers(self.watchedSymbols)
+            self.updateTickerGui(tickers)
 
     # Gets trade data from CryptoCompare
     ############################################################################
-    def plotLoop(self):
-        while True:
-            if self.internetUp:
-                tupleList = CryptoCompareAPI().getTradeHistory()
-                self.updatePlots(tupleList)
-            else:
-                continue
+    def pollTradeHistory(self):
+        # Load stored history once, then fetch only the newest bars
+        if self.cryptoCompare is None:
+            self.cryptoCompare = CryptoCompareAPI(
+                chartMinutes=self.settings.get('chartMinutes', 1440))
+        else:
+            self.cryptoCompare.updateTradeHistory()
 
-            time.sleep(15)
+        tupleList = self.cryptoCompare.getTradeHistory()
+        self.updatePlots(tupleList)
 
-    # Gets user trades from Gemini
+    # Syncs new user trades of every watched symbol from Gemini into the
+    # trade store, the blotter is sent the stored btcusd trades it lacks
     ############################################################################
-    def tradesLoop(self):
-        while True:
-            trades = GeminiPrivateAPI(self.account).getTrades('btcusd')
-
-            if isinstance(trades, list):
-                self.connected = True
-            else:
-                self.connected = False
-
-            self.updateTradeGUI(trades)
-            time.sleep(15)
+    def pollTrades(self):
+        store = self.tradeStore
+        try:
+            newTrades = store.sync(GeminiPrivateAPI(self.account),
+                self.watchedSymbols)
+            self.connected = isinstance(newTrades, dict)
+        finally:
+            # Read back from the store, so trades stored before a failed
+            # request still reach the blotter
+            self.loadStoredTrades(store)
 
     # Gets user balance and available for trade
     ############################################################################
-    def balancesLoop(self):
-        while True:
-            balances = GeminiPrivateAPI(self.account).getBalances()
-            self.updateBalanceGui(balances)
-            time.sleep(15)
+    def pollBalances(self):
+        balances = GeminiPrivateAPI(self.account).getBalances()
+        self.updateBalanceGui(balances)
 
     # Updates plots for trade history
     ############################################################################
     def updatePlots(self, tupleList):
-        # times = [0], closes = [1], range = [2], delta = [3]
+        # times = [0], closes = [1], range = [2], delta = [3], ohlcv = [4]
 
         btcusdTuple = tupleList[0]
         ethusdTuple = tupleList[1]
 
         # Update range and delta
-        self.btcRangeLabel.setText(btcusdTuple[2])
-        self.btcDeltaLabel.setText(btcusdTuple[3])
-        self.ethRangeLabel.setText(ethusdTuple[2])
-        self.ethDeltaLabel.setText(ethusdTuple[3])
-
-        # Clear plot for new data
-        self.btcFigure.clear()
-        self.ethFigure.clear()
-
-        # Add axis
-        btcAx = self.btcFigure.add_subplot(111)
-        ethAx = self.ethFigure.add_subplot(111)
-
-        # Customize axis
-        btcAx.xaxis.grid(b=None, which='major', linestyle=':')
-        btcAx.yaxis.grid(b=None, which='major', linestyle=':')
-        ethAx.xaxis.grid(b=None, which='major', linestyle=':')
-        ethAx.yaxis.grid(b=None, which='major', linestyle=':')
-
-        btcXTicks = [dt.fromtimestamp(i) for i in btcusdTuple[0]]
-        ethXTicks = [dt.fromtimestamp(i) for i in ethusdTuple[0]]
-
-        xfmt = md.DateFormatter('%H:%M')
-        btcAx.xaxis.set_major_formatter(xfmt)
-        ethAx.xaxis.set_major_formatter(xfmt)
-        xloc = md.HourLocator(interval=4)
-        btcAx.xaxis.set_major_locator(xloc)
-        ethAx.xaxis.set_major_locator(xloc)
-
-        # Plot data
-        btcAx.plot(btcXTicks, btcusdTuple[1], '-', color='k', linewidth=1)
-        ethAx.plot(ethXTicks, ethusdTuple[1], '-', color='k', linewidth=1)
+        self.uiBus.setText(self.btcRangeLabel, btcusdTuple[2])
+        self.uiBus.setText(self.btcDeltaLabel, btcusdTuple[3])
+        self.uiBus.setText(self.ethRangeLabel, ethusdTuple[2])
+        self.uiBus.setText(self.ethDeltaLabel, ethusdTuple[3])
+
+        # Queue new data, the render thread delivers finished frames
+        self.chartRenderer.update(self.btcChart, btcusdTuple[0], btcusdTuple[1],
+            btcusdTuple[4])
+        self.chartRenderer.update(self.ethChart, ethusdTuple[0], ethusdTuple[1],
+            ethusdTuple[4])
+
+    # Appends trades read from store to the trades list view
+    ############################################################################
+    def updateTradeGUI(self, store, trades):
+        # Trades read before switching accounts are dropped
+        if store is not self.tradeStore:
+            return
 
-        # Refresh
-        self.btcCanvas.draw()
-        self.ethCanvas.draw()
+        self.tradesModel.appendTrades(trades)
 
-    # Updates trades in trades list view
+    # Updates the ticker labels from tickers keyed by symbol, any thread
     ############################################################################
-    def updateTradeGUI(self, trades):
-        sList = []
-        width = 15
-
-        self.tradesModel.clear()
-
-        orderID = 'Order ID'
-        orderID = "{0:<{1}}".format(orderID[:width], width)
-
-        tradeType = 'Type'
-        tradeType = "{0:<{1}}".format(tradeType[:7], 7)
-
-        time = 'Date + Time'
-        time = "{0:<{1}}".format(time[:25], 25)
-
-        amount = 'Amount'
-        amount = "{0:<{1}}".format(amount[:width], width)
-
-        price = 'Price'
-        price = "{0:<{1}}".format(price[:width], width)
-
-        fee = 'Fee'
-        fee = "{0:<{1}}".format(fee[:5], 5)
-
-        s = orderID + tradeType + time + amount + price + fee
-        sList.append(s)
-        hline = '-' * 87
-        sList.append(hline)
-
-        for trade in trades:
-            orderID = "{0:<{1}}".format(str(trade.get('order_id'))[:width],
-                width)
-            orderID.ljust(width)
-
-            tradeType = "{0:<{1}}".format(str(trade.get('type'))[:7], 7)
-            tradeType.ljust(7)
-
-            time = trade.get('timestampms')
-            time = dt.fromtimestamp(time/1000.0).strftime("%Y-%m-%d %H:%M:%S")
-            time = "{0:<{1}}".format(str(time)[:25], 25)
-            time.ljust(25)
-
-            amount = "{0:<{1}}".format(str(trade.get('amount'))[:width], width)
-            amount.ljust(width)
-
-            price = str('$' + '%.2f' % float(trade.get('price')))
-            price = "{0:<{1}}".format(price[:width], width)
-            price.ljust(width)
-
-            if trade.get('fee_currency') == 'USD':
-                fee = str('$' + '%.2f' % float(trade.get('fee_amount')))
-                fee = "{0:<{1}}".format(fee[:5], 5)
-                fee.ljust(5)
-            else:
-                fee = "{0:<{1}}".format(str(trade.get('fee'))[:width], width)
-                fee.ljust(width)
-
-            s = orderID + tradeType + time + amount + price + fee
-            sList.append(s)
+    def updateTickerGui(self, tickers):
+        for symbol, ticker in tickers.items():
+            # Make sure there is a ticker value for last price
+            if not ticker.last:
+                continue
 
-        for s in sList:
-            item = QStandardItem()
-            item.setText(s)
-            self.tradesModel.appendRow(item)
+            if symbol == 'btcusd':
+                self.uiBus.setText(self.btcLastPriceLabel, '$' + ticker.last)
+            elif symbol == 'ethusd':
+                self.uiBus.setText(self.ethLastPriceLabel, '$' + ticker.last)
 
-    # Updates the ticker labels
+    # Updates a ticker label from the market data stream thread
     ############################################################################
-    def updateTickerGui(self, tickerList):
-        # Make sure there are ticker values for last price
-        for ticker in tickerList:
-            if not ticker['last']:
-                return
+    def postStreamTicker(self, symbol, ticker):
+        self.updateTickerGui({symbol: ticker})
 
-        self.btcLastPriceLabel.setText('$' + tickerList[0]['last'])
-        self.ethLastPriceLabel.setText('$' + tickerList[1]['last'])
+    # Updates status bar when the market data stream goes up or down
+    ############################################################################
+    @pyqtSlot(bool)
+    def updateStreamStatus(self, status):
+        if status:
+            self.statusBar.showMessage('Streaming market data from Gemini.')
+        else:
+            self.statusBar.showMessage('Market data stream down, polling.')
 
-    # Updates balance labels
+    # Updates balance labels, any thread
     ############################################################################
     def updateBalanceGui(self, balances):
         # Handle error which is returned as a string from Gemini
         if isinstance(balances, str):
-            msg = QMessageBox()
-            msg.setText(balances)
-            msg.exec()
+            self.uiBus.post('balanceError', self.showError, balances)
             return
 
         # Update balances
-        for item in balances:
-            if item['currency'] == 'BTC':
-                self.btcBalanceLabel.setText(item['amount'])
-                self.btcAvailableLabel.setText(item['available'])
-            elif item['currency'] == 'USD':
-                self.usdBalanceLabel.setText('$'+item['amount'])
-                self.usdAvailableLabel.setText('$'+item['available'])
-            elif item['currency'] == 'ETH':
-                self.ethBalanceLabel.setText(item['amount'])
-                self.ethAvailableLabel.setText(item['available'])
+        for balance in balances:
+            if balance.currency == 'BTC':
+                self.uiBus.setText(self.btcBalanceLabel, balance.amount)
+                self.uiBus.setText(self.btcAvailableLabel, balance.available)
+            elif balance.currency == 'USD':
+                self.uiBus.setText(self.usdBalanceLabel, '$'+balance.amount)
+                self.uiBus.setText(self.usdAvailableLabel,
+                    '$'+balance.available)
+            elif balance.currency == 'ETH':
+                self.uiBus.setText(self.ethBalanceLabel, balance.amount)
+                self.uiBus.setText(self.ethAvailableLabel, balance.available)
+
+    # Shows an error message box, GUI thread only
+    ############################################################################
+    def showError(self, text):
+        msg = QMessageBox()
+        msg.setText(text)
+        msg.exec()
@@ -0,0 +1,380 @@
+################################################################################
+#                                                                              #
+#  NativePriceChart.py                                                         #
+#  Author: Cody Johnson <codyj@protonmail.com>                                 #
+#                                                                              #
+################################################################################
+
+# Price line chart drawn with QPainter into a QImage, a lightweight
+# alternative to PriceChart that needs no matplotlib. Frame, axes, grid and
+# tick labels are drawn into a cached background layer that is redrawn only
+# when the size or the snapped limits change; a frame is that layer plus one
+# QPainterPath of the downsampled line, or one drawLines call for the wicks
+# and one drawRects call per color for candle bodies and volume bars.
+#
+# Has the same interface as PriceChart: setData and setSize may be called
+# from any thread, render only from the render thread (see ChartRenderer).
+
+import math, threading, time
+from datetime import datetime as dt
+import numpy as np
+from PyQt5.QtCore import Qt, QPointF, QRectF, QLineF
+from PyQt5.QtGui import QImage, QPainter, QPainterPath, QPen, QColor, QFont
+from PyQt5.QtGui import QFontMetrics
+from Downsample import DownsampleCache
+import Candles
+from Crosshair import makeLayout
+
+class NativePriceChart:
+    # Class data
+    size = (640, 480)       # Pixel size requested by the view
+    times = None            # Pending unix times, None if unchanged
+    prices = None           # Pending prices
+    ohlcv = None            # Pending (opens, highs, lows, closes, volumes)
+    mode = Candles.LINE     # LINE, CANDLES or VOLUMES
+    modeChanged = False     # True if mode changed since last render
+    resized = True          # True if size changed since last render
+    frame = None            # Finished frame, RGBA
+    background = None       # Cached frame, grid and labels
+    content = None          # Cached line path or bar shapes in pixels
+    series = None           # Full series and its downsampled levels
+    bars = None             # OHLCV bars for CANDLES and VOLUMES
+    verts = None            # Reusable quad vertices for bars
+    upColor = QColor(38, 166, 91)       # Bars closing at or above open
+    downColor = QColor(214, 69, 65)     # Bars closing below open
+    xLimits = None          # (min, max) unix seconds shown
+    yLimits = None          # (min, max) price shown
+    plotRect = None         # Pixel rectangle inside the axes
+    layout = None           # Hover layout of the last frame
+    xStep = 3600            # X limits snap to whole hours (in seconds)
+    # Seconds between x ticks, the shortest giving at most maxXTicks, from
+    # local hours divisible by 4 up to years
+    xTickSteps = (4 * 3600, 12 * 3600, 86400, 2 * 86400, 7 * 86400,
+        14 * 86400, 30 * 86400, 91 * 86400, 365 * 86400)
+    maxXTicks = 8           # Ticks before moving to a longer step
+    yMargin = 0.05          # Fraction of price range padded above and below
+    maxYTicks = 8           # Upper bound on y tick count
+
+    # Initializer
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.series = DownsampleCache()
+        self.bars = Candles.OhlcvBuffer()
+        self.font = QFont()
+        self.font.setPixelSize(11)
+
+    # Queues new unix times, prices and optional OHLCV for the next render
+    ############################################################################
+    def setData(self, times, prices, ohlcv=None):
+        with self.lock:
+            self.times = times
+            self.prices = prices
+            self.ohlcv = ohlcv
+
+    # Switches between LINE, CANDLES and VOLUMES at the next render
+    ############################################################################
+    def setMode(self, mode):
+        with self.lock:
+            if mode != self.mode:
+                self.mode = mode
+                self.modeChanged = True
+
+    # Queues a new pixel size for the next render
+    ############################################################################
+    def setSize(self, width, height):
+        with self.lock:
+            if (width, height) != self.size and width > 0 and height > 0:
+                self.size = (width, height)
+                self.resized = True
+
+    # Queues an empty chart for the next render
+    ############################################################################
+    def clear(self):
+        self.setData([], [])
+
+    # Applies pending changes and paints, returns the RGBA pixels
+    ############################################################################
+    def render(self):
+        with self.lock:
+            times, prices, ohlcv = self.times, self.prices, self.ohlcv
+            self.times = self.prices = self.ohlcv = None
+            resized, self.resized = self.resized, False
+            modeChanged, self.modeChanged = self.modeChanged, False
+            width, height = self.size
+
+        if resized or self.frame is None:
+            self.frame = QImage(width, height, QImage.Format_RGBA8888)
+            self.background = None
+
+        if times is not None:
+            x = np.asarray(times, dtype=float)
+            # Copied, the caller's arrays change on its next poll
+            self.series.setData(x, np.array(prices, dtype=float))
+            if ohlcv is not None:
+                self.bars.set(x, *ohlcv)
+            else:
+                self.bars.set([], [], [], [], [], [])
+
+        # A new mode starts from fresh limits
+        if modeChanged:
+            self.xLimits = self.yLimits = None
+        if (times is not None or modeChanged) and self.fitLimits():
+            self.background = None
+
+        if self.background is None:
+            self.drawBackground()
+            self.content = None
+        elif times is not None or modeChanged:
+            self.content = None
+        if self.content is None:
+            self.content = self.buildContent()
+            rect = self.plotRect
+            self.layout = makeLayout((rect.left(), rect.top(), rect.width(),
+                rect.height()), self.xLimits, self.yLimits, self.series.x,
+                self.series.y, self.bars.view())
+
+        painter = QPainter(self.frame)
+        painter.drawImage(0, 0, self.background)
+        painter.setClipRect(self.plotRect)
+        self.drawContent(painter)
+        painter.end()
+
+        bits = self.frame.bits()
+        bits.setsize(self.frame.byteCount())
+        return np.frombuffer(bits, np.uint8).reshape(height, width, 4)
+
+    # Fits limits to the data shown in the current mode, returns True if
+    # they changed
+    ############################################################################
+    def fitLimits(self):
+        if self.mode == Candles.LINE:
+            x, y = self.series.x, self.series.y
+        else:
+            bars = self.sampledBars()
+            x, y = bars[Candles.TIME], Candles.limitValues(bars, self.mode)
+
+        if not len(x):
+            return False
+        return self.updateLimits(x, y)
+
+    # Snaps limits around the data, returns True if they changed
+    ############################################################################
+    def updateLimits(self, x, y):
+        xMin, xMax = self.xLimits if self.xLimits else (np.inf, -np.inf)
+        yMin, yMax = self.yLimits if self.yLimits else (np.inf, -np.inf)
+        changed = False
+
+        # X: whole hours around the window, moves about once an hour
+        if x[0] < xMin or x[-1] > xMax or x[-1] < xMax - 2 * self.xStep:
+            self.xLimits = (math.floor(x[0] / self.xStep) * self.xStep,
+                math.ceil(x[-1] / self.xStep) * self.xStep)
+            changed = True
+
+        # Y: padded price range, refit when data leaves it or uses too little
+        low = y.min()
+        high = y.max()
+        pad = max((high - low) * self.yMargin, abs(high) * 1e-4)
+        if (low < yMin or high > yMax
+                or (high - low) + 2 * pad < 0.5 * (yMax - yMin)):
+            self.yLimits = (low - pad, high + pad)
+            changed = True
+
+        return changed
+
+    # Paints frame, grid and tick labels into the background layer
+    ############################################################################
+    def drawBackground(self):
+        width, height = self.frame.width(), self.frame.height()
+        metrics = QFontMetrics(self.font)
+        xTicks = self.xTicks()
+        yTicks = self.yTicks()
+
+        # Leave room for the widest price label and one row of time labels
+        labelWidth = max([metrics.width(label) for value, label in yTicks],
+            default=0)
+        left = labelWidth + 12
+        bottom = metrics.height() + 10
+        self.plotRect = QRectF(left, 8, max(width - left - 12, 1),
+            max(height - bottom - 8, 1))
+        rect = self.plotRect
+
+        self.background = QImage(width, height, QImage.Format_RGBA8888)
+        self.background.fill(Qt.white)
+        painter = QPainter(self.background)
+        painter.setFont(self.font)
+        gridPen = QPen(QColor(176, 176, 176), 1, Qt.DotLine)
+
+        for value, label in xTicks:
+            px = self.toX(value)
+            painter.setPen(gridPen)
+            painter.drawLine(QPointF(px, rect.top()),
+                QPointF(px, rect.bottom()))
+            painter.setPen(Qt.black)
+            painter.drawText(QRectF(px - 40, rect.bottom() + 4, 80,
+                metrics.height()), Qt.AlignHCenter | Qt.AlignTop, label)
+
+        for value, label in yTicks:
+            py = self.toY(value)
+            painter.setPen(gridPen)
+            painter.drawLine(QPointF(rect.left(), py),
+                QPointF(rect.right(), py))
+            painter.setPen(Qt.black)
+            painter.drawText(QRectF(0, py - metrics.height() / 2,
+                rect.left() - 6, metrics.height()),
+                Qt.AlignRight | Qt.AlignVCenter, label)
+
+        painter.setPen(QPen(Qt.black, 1))
+        painter.drawRect(rect)
+        painter.end()
+
+    # Returns (time, label) at local hours divisible by 4, like HourLocator,
+    # or at whole local days for ranges too long for that
+    ############################################################################
+    def xTicks(self):
+        if self.xLimits is None:
+            return []
+
+        xMin, xMax = self.xLimits
+        step = next((step for step in self.xTickSteps
+            if (xMax - xMin) / step <= self.maxXTicks), self.xTickSteps[-1])
+        labelFormat = '%H:%M' if step < 86400 else '%m-%d'
+
+        offset = time.localtime(xMin).tm_gmtoff
+        tick = math.ceil((xMin + offset) / step) * step - offset
+
+        ticks = []
+        while tick <= xMax:
+            ticks.append((tick, dt.fromtimestamp(tick).strftime(labelFormat)))
+            tick += step
+        return ticks
+
+    # Returns (price, label) at a round step giving at most maxYTicks
+    ############################################################################
+    def yTicks(self):
+        if self.yLimits is None:
+            return []
+
+        yMin, yMax = self.yLimits
+        raw = (yMax - yMin) / self.maxYTicks
+        if raw <= 0:
+            return []
+        magnitude = 10 ** math.floor(math.log10(raw))
+        for multiple in (1, 2, 2.5, 5, 10):
+            step = multiple * magnitude
+            if step >= raw:
+                break
+
+        # Enough decimals for the step, one more for steps like 0.25
+        decimals = max(0, -math.floor(math.log10(step) + 1e-9))
+        if abs(round(step, decimals) - step) > step * 1e-9:
+            decimals += 1
+
+        ticks = []
+        tick = math.ceil(yMin / step) * step
+        while tick <= yMax:
+            ticks.append((tick, '%.*f' % (decimals, tick)))
+            tick += step
+        return ticks
+
+    # Maps unix time to pixel x
+    ############################################################################
+    def toX(self, value):
+        xMin, xMax = self.xLimits
+        rect = self.plotRect
+        return rect.left() + (value - xMin) / (xMax - xMin) * rect.width()
+
+    # Maps price to pixel y
+    ############################################################################
+    def toY(self, value):
+        yMin, yMax = self.yLimits
+        rect = self.plotRect
+        return rect.bottom() - (value - yMin) / (yMax - yMin) * rect.height()
+
+    # Builds what drawContent paints for the current mode
+    ############################################################################
+    def buildContent(self):
+        if self.mode == Candles.LINE:
+            return self.buildPath()
+        return self.buildBars()
+
+    # Paints the cached line or bars
+    ############################################################################
+    def drawContent(self, painter):
+        if self.mode == Candles.LINE:
+            painter.setRenderHint(QPainter.Antialiasing)
+            painter.setPen(QPen(Qt.black, 1))
+            painter.drawPath(self.content)
+            return
+
+        wicks, upRects, downRects = self.content
+        painter.setPen(QPen(Qt.black, 1))
+        painter.drawLines(wicks)
+        painter.setPen(self.upColor)
+        painter.setBrush(self.upColor)
+        painter.drawRects(upRects)
+        painter.setPen(self.downColor)
+        painter.setBrush(self.downColor)
+        painter.drawRects(downRects)
+
+    # Returns bars merged down to at most one per three pixels, so their
+    # number stays bounded however much history is loaded
+    ############################################################################
+    def sampledBars(self):
+        bars, size = Candles.resample(self.bars.view(),
+            self.frame.width() // 3)
+        return bars
+
+    # Builds wick lines and up and down rectangles
+    ############################################################################
+    def buildBars(self):
+        bars = self.sampledBars()
+        count = bars.shape[1]
+        if not count or self.xLimits is None:
+            return ([], [], [])
+
+        x = bars[Candles.TIME]
+        width = Candles.barWidth(x)
+        self.verts = Candles.reserveVerts(self.verts, 2 * count)
+        if self.mode == Candles.CANDLES:
+            verts = Candles.candleVerts(x, bars, width, self.verts)
+        else:
+            verts = Candles.volumeVerts(x, bars, width, self.verts)
+
+        # Map all vertices at once, bodies are the last count quads and
+        # corners 1 and 2 are their top edge
+        px = self.toX(verts[:, :, 0])
+        py = self.toY(verts[:, :, 1])
+        left, right = px[-count:, 0], px[-count:, 2]
+        top, bottom = py[-count:, 1], py[-count:, 0]
+
+        rects = [QRectF(left[i], top[i], right[i] - left[i],
+            max(bottom[i] - top[i], 1.0)) for i in range(count)]
+        up = Candles.rising(bars)
+        upRects = [rect for rect, isUp in zip(rects, up) if isUp]
+        downRects = [rect for rect, isUp in zip(rects, up) if not isUp]
+
+        wicks = []
+        if self.mode == Candles.CANDLES:
+            wicks = [QLineF(px[i, 0], py[i, 0], px[i, 1], py[i, 1])
+                for i in range(count)]
+        return (wicks, upRects, downRects)
+
+    # Builds the line path from the series downsampled to the plot width
+    ############################################################################
+    def buildPath(self):
+        path = QPainterPath()
+        x, y = self.series.get(int(self.plotRect.width()))
+        if not len(x) or self.xLimits is None:
+            return path
+
+        # Map all points at once, then feed them to the path
+        xMin, xMax = self.xLimits
+        yMin, yMax = self.yLimits
+        rect = self.plotRect
+        px = rect.left() + (x - xMin) * (rect.width() / (xMax - xMin))
+        py = rect.bottom() - (y - yMin) * (rect.height() / (yMax - yMin))
+
+        path.moveTo(px[0], py[0])
+        for i in range(1, len(px)):
+            path.lineTo(px[i], py[i])
+        return path
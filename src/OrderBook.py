@@ -0,0 +1,245 @@
+################################################################################
+#                                                                              #
+#  OrderBook.py                                                                #
+#  Author: Cody Johnson <codyj@protonmail.com>                                 #
+#                                                                              #
+################################################################################
+
+# Level 2 order book kept up to date from one snapshot plus streamed changes.
+# Each side keeps its levels in parallel arrays sorted by price, so updates
+# are a binary search and the best level is always at a fixed end. Prices
+# and amounts are fixed-point ints in the symbol's scales, so sorting, depth
+# sums and the spread are exact. The scales come from cached symbol details
+# and may be stale: a value finer than they hold refines the whole book to
+# its decimals instead of being truncated onto another level.
+
+import threading
+from bisect import bisect_left
+from FixedPoint import FixedPoint, fromIncrement
+from Records import DepthLevel
+
+class BookSide:
+    # Class data
+    isBid = False       # Bids are best at the end, asks at the start
+    priceScale = None   # FixedPoint of prices
+    amountScale = None  # FixedPoint of amounts
+    keys = []           # Sorted fixed-point prices (ascending)
+    prices = []         # Price strings as received, parallel to keys
+    amounts = []        # Fixed-point amount per level, parallel to keys
+    total = 0           # Sum of all amounts on this side
+
+    # Initializer
+    def __init__(self, isBid, priceScale, amountScale):
+        self.isBid = isBid
+        self.priceScale = priceScale
+        self.amountScale = amountScale
+        self.clear()
+
+    # Number of price levels
+    def __len__(self):
+        return len(self.keys)
+
+    # Removes all levels
+    ############################################################################
+    def clear(self):
+        self.keys = []
+        self.prices = []
+        self.amounts = []
+        self.total = 0
+
+    # Sets amount at price, an amount of zero removes the level
+    ############################################################################
+    def update(self, price, amount):
+        key = self.priceScale.parse(price)
+        amount = self.amountScale.parse(amount)
+        i = bisect_left(self.keys, key)
+        exists = i < len(self.keys) and self.keys[i] == key
+
+        if exists:
+            self.total -= self.amounts[i]
+            if amount == 0:
+                del self.keys[i]
+                del self.prices[i]
+                del self.amounts[i]
+                return
+            self.amounts[i] = amount
+        elif amount == 0:
+            return
+        else:
+            self.keys.insert(i, key)
+            self.prices.insert(i, price)
+            self.amounts.insert(i, amount)
+
+        self.total += amount
+
+    # Switches to finer scales, multiplying prices by priceFactor and
+    # amounts by amountFactor
+    ############################################################################
+    def rescale(self, priceScale, amountScale, priceFactor, amountFactor):
+        self.priceScale = priceScale
+        self.amountScale = amountScale
+        self.keys = [key * priceFactor for key in self.keys]
+        self.amounts = [amount * amountFactor for amount in self.amounts]
+        self.total *= amountFactor
+
+    # Returns (price, amount) of the best level or None
+    ############################################################################
+    def best(self):
+        if not self.keys:
+            return None
+
+        i = -1 if self.isBid else 0
+        return (self.prices[i], self.amounts[i])
+
+    # Returns the best n levels as DepthLevel, best first
+    ############################################################################
+    def top(self, n):
+        if self.isBid:
+            start = max(len(self.keys) - n, 0)
+            return [DepthLevel(self.prices[i], self.amounts[i])
+                for i in range(len(self.keys) - 1, start - 1, -1)]
+        else:
+            return [DepthLevel(self.prices[i], self.amounts[i])
+                for i in range(min(n, len(self.keys)))]
+
+    # Returns the summed amount of the best n levels
+    ############################################################################
+    def depth(self, n):
+        if self.isBid:
+            return sum(self.amounts[max(len(self.amounts) - n, 0):])
+        else:
+            return sum(self.amounts[:n])
+
+    # Returns the summed amount of every level past the best n
+    ############################################################################
+    def depthBeyond(self, n):
+        return self.total - self.depth(n)
+
+
+class OrderBook:
+    # Class data
+    symbol = ''         # Symbol of this book: "btcusd"
+    priceScale = None   # FixedPoint of prices, the quote increment
+    amountScale = None  # FixedPoint of amounts, the tick size
+    bids = None         # BookSide for bids
+    asks = None         # BookSide for asks
+    version = 0         # Incremented on every change
+    ready = False       # True once a snapshot has been applied
+
+    # Initializer
+    def __init__(self, symbol, priceScale=None, amountScale=None):
+        self.symbol = symbol.lower()
+        self.priceScale = priceScale if priceScale else FixedPoint(8)
+        self.amountScale = amountScale if amountScale else FixedPoint(8)
+        self.bids = BookSide(True, self.priceScale, self.amountScale)
+        self.asks = BookSide(False, self.priceScale, self.amountScale)
+        self.condition = threading.Condition()
+
+    # Replaces the book with REST snapshot levels, lists of BookLevel
+    ############################################################################
+    def applySnapshot(self, bids, asks):
+        with self.condition:
+            self.bids.clear()
+            self.asks.clear()
+            for level in bids:
+                self.update(self.bids, level.price, level.amount)
+            for level in asks:
+                self.update(self.asks, level.price, level.amount)
+            self.ready = True
+            self.notify()
+
+    # Applies streamed level changes: [side, price, quantity]
+    ############################################################################
+    def applyChanges(self, changes):
+        with self.condition:
+            for side, price, quantity in changes:
+                if side == 'buy':
+                    self.update(self.bids, price, quantity)
+                else:
+                    self.update(self.asks, price, quantity)
+            self.ready = True
+            self.notify()
+
+    # Sets a level on side, refining the scales first if price or amount
+    # has more decimals than they hold. Caller holds the condition
+    ############################################################################
+    def update(self, side, price, amount):
+        try:
+            side.update(price, amount)
+        except ValueError:
+            self.refine(fromIncrement(price).decimals,
+                fromIncrement(amount).decimals)
+            side.update(price, amount)
+
+    # Rescales both sides to at least the given decimals, caller holds the
+    # condition
+    ############################################################################
+    def refine(self, priceDecimals, amountDecimals):
+        priceScale = FixedPoint(max(priceDecimals, self.priceScale.decimals))
+        amountScale = FixedPoint(max(amountDecimals,
+            self.amountScale.decimals))
+        print('Order book ' + self.symbol + ' refined to '
+            + str(priceScale.decimals) + ' price and '
+            + str(amountScale.decimals) + ' amount decimals')
+
+        priceFactor = priceScale.factor // self.priceScale.factor
+        amountFactor = amountScale.factor // self.amountScale.factor
+        for side in (self.bids, self.asks):
+            side.rescale(priceScale, amountScale, priceFactor, amountFactor)
+        self.priceScale = priceScale
+        self.amountScale = amountScale
+
+    # Empties the book, e.g. before resubscribing
+    ############################################################################
+    def clear(self):
+        with self.condition:
+            self.bids.clear()
+            self.asks.clear()
+            self.ready = False
+            self.notify()
+
+    # Bumps version and wakes up readers, caller holds the condition
+    ############################################################################
+    def notify(self):
+        self.version += 1
+        self.condition.notify_all()
+
+    # Blocks until the book changes past version or timeout expires
+    ############################################################################
+    def waitForUpdate(self, version, timeout=None):
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+    # Returns best bid price string or ''
+    ############################################################################
+    def bestBid(self):
+        with self.condition:
+            best = self.bids.best()
+        return best[0] if best else ''
+
+    # Returns best ask price string or ''
+    ############################################################################
+    def bestAsk(self):
+        with self.condition:
+            best = self.asks.best()
+        return best[0] if best else ''
+
+    # Returns a consistent view of the top n levels on both sides, amounts
+    # and spread are fixed-point ints in the returned scales
+    ############################################################################
+    def snapshot(self, n):
+        with self.condition:
+            if not self.bids or not self.asks:
+                return None
+
+            return {
+                'version': self.version,
+                'asks': self.asks.top(n),
+                'bids': self.bids.top(n),
+                'askDepthBeyond': self.asks.depthBeyond(n),
+                'bidDepthBeyond': self.bids.depthBeyond(n),
+                'spread': self.asks.keys[0] - self.bids.keys[-1],
+                'priceScale': self.priceScale,
+                'amountScale': self.amountScale
+            }
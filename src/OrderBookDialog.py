@@ -6,12 +6,19 @@
 ################################################################################
 
 import sys, json, threading, time, urllib
-from urllib.request import urlopen
+from HttpTransport import getTransport
+from SymbolCache import getSymbolCache
+from ConnectivityMonitor import getConnectivityMonitor
+from RateLimiter import getRateLimiter
+from Resilience import getResilience
 from ui_OrderBookDialog import Ui_OrderBookDialog
 from PyQt5 import uic, QtGui, QtWidgets
-from PyQt5.QtGui import QStandardItemModel, QStandardItem, QFontDatabase
-from PyQt5.QtWidgets import QListView
-from PyQt5.QtCore import pyqtSlot, pyqtSignal, QModelIndex, QThread, QObject
+from PyQt5.QtGui import QFontDatabase
+from PyQt5.QtWidgets import QListView, QAbstractItemView
+from PyQt5.QtCore import pyqtSlot, pyqtSignal, QThread, QObject, QEvent
+from OrderBook import OrderBook
+from Records import BookLevel
+from OrderBookModel import OrderBookModel
 
 class Worker(QObject):
     baseUrl = 'https://api.gemini.com/v1/book/'
@@ -20,155 +27,182 @@ class Worker(QObject):
     flag = None                             # 'BTCUSD', 'ETHUSD', 'ETHBTC'
     cutoff = None                           # Number of asks and bids to display
     width = None                            # Width of data fields
-    data = {}                               # Data received
+    book = None                             # OrderBook engine read for display
+    streamBook = None                       # Book kept by the stream, or None
+    restBook = None                         # Private book seeded from REST
+    marketData = None                       # Stream keeping book up to date
+    pollInterval = 5                        # Seconds between REST snapshots
+    idlePollInterval = 30                   # REST snapshots while unfocused
+    minInterval = 0.25                      # Minimum seconds between updates
+    idleMinInterval = 2.0                   # Update throttle while unfocused
+    focused = True                          # Update in real time if True
+    paused = False                          # Stop updates while not shown
     stringList = []                         # Data strings for QListView
+    spreadRow = 0                           # Index of spread in stringList
     stopWorking = False                     # Flag to stop work
-    dataReady = pyqtSignal(str, list)       # Signal GUI update
+    dataReady = pyqtSignal(str, list, int)  # Signal GUI update
 
     # Initializer
-    def __init__(self, flag, cutoff=9, width=15, nAsks=0, nBids=0):
+    def __init__(self, flag, book=None, marketData=None, cutoff=9, width=15,
+            nAsks=0, nBids=0):
         super(QObject, self).__init__()
         self.flag = flag
+        self.streamBook = book
+        if book:
+            self.restBook = OrderBook(flag, book.priceScale, book.amountScale)
+        else:
+            self.restBook = OrderBook(flag, *getSymbolCache().getScales(flag))
+        self.book = self.restBook
+        self.marketData = marketData
         self.cutoff = cutoff
         self.width = width
         self.nAsks = nAsks
         self.nBids = nBids
+        self.stringList = []
+        self.wakeEvent = threading.Event()
 
     # Stops working
     ############################################################################
     def stopWork(self):
         self.stopWorking = True
+        self.wakeEvent.set()
+
+    # Sets update rate from the dialog's state, safe to call from any thread
+    ############################################################################
+    def setActivity(self, focused, shown):
+        self.focused = focused
+        self.paused = not shown
+        self.wakeEvent.set()
+
+    # Sleeps for seconds or until setActivity or stopWork is called
+    ############################################################################
+    def sleep(self, seconds):
+        self.wakeEvent.wait(seconds)
+        self.wakeEvent.clear()
+
+    # Returns True if the market data stream is keeping its book current
+    ############################################################################
+    def isStreaming(self):
+        return (self.marketData is not None and self.streamBook is not None
+            and self.marketData.isConnected() and self.streamBook.ready)
 
     # Run function
     ############################################################################
     @pyqtSlot()
     def work(self):
-        while True:
-            if self.stopWorking:
-                print('Exiting thread')
-                break
-            print('Getting '+self.flag+' data')
-            self.getData()
-            askList, bidList = self.parseData()
-            tupled = self.computeCutoffs(askList, bidList)
-            self.generateStringList(tupled)
-            self.dataReady.emit(self.flag, self.stringList)
-            if self.stopWorking:
-                print('Exiting thread')
-                break
-            time.sleep(5)
-
-    # Receive JSON data from Gemini
+        version = None
+        while not self.stopWorking:
+            # Nothing is shown, the latest book is sent once shown again
+            if self.paused:
+                self.sleep(self.idlePollInterval)
+                continue
+
+            pollInterval = (self.pollInterval if self.focused
+                else self.idlePollInterval)
+
+            # Show the stream's book while it delivers, otherwise a private
+            # book seeded from REST, so REST never overwrites streamed levels
+            streaming = self.isStreaming()
+            book = self.streamBook if streaming else self.restBook
+            if book is not self.book:
+                self.book = book
+                version = None
+
+            if not streaming:
+                # Sleep while offline instead of failing requests
+                if not getConnectivityMonitor().waitUntilOnline(
+                        pollInterval):
+                    continue
+                print('Getting '+self.flag+' data')
+                try:
+                    self.getData()
+                except Exception as err:
+                    # Keep the thread alive, the next poll tries again
+                    print('Order book error for '+self.flag+': '+str(err))
+
+            snapshot = self.book.snapshot(self.cutoff)
+            if snapshot and snapshot['version'] != version:
+                version = snapshot['version']
+                self.generateStringList(snapshot)
+                self.dataReady.emit(self.flag, list(self.stringList),
+                    self.spreadRow)
+
+            if streaming:
+                # Throttle GUI updates, then sleep until the book changes
+                self.sleep(self.minInterval if self.focused
+                    else self.idleMinInterval)
+                self.book.waitForUpdate(version, pollInterval)
+            else:
+                self.sleep(pollInterval)
+
+        print('Exiting thread')
+
+    # Load a full book snapshot from Gemini into the private REST book
     ############################################################################
     def getData(self):
         paramStr = '?limit_bids='+str(self.nBids)+'&limit_asks='+str(self.nAsks)
-        response = urlopen(self.baseUrl+self.flag.lower()+paramStr)
-        self.data = json.loads(response.read())
 
-    # Parse JSON data
-    ############################################################################
-    def parseData(self):
-        # If no data, return
-        if not self.data:
-            return
+        def fetch():
+            getRateLimiter().acquire('public', 'book')
+            return getTransport().getJson(self.baseUrl+self.flag.lower()
+                + paramStr)
 
-        askList = self.data.get('asks')
-        bidList = self.data.get('bids')
-        # Format trailing decimals
-        for item in askList:
-            item['amount'] = str("%.8f" % float(item['amount']))
-        for item in bidList:
-            item['amount'] = str("%.8f" % float(item['amount']))
-
-        #return items
-        return (askList, bidList)
-
-    # Compute cutoff values
-    ############################################################################
-    def computeCutoffs(self, askList, bidList):
-        # Sort
-        askList.sort(key=lambda k: float(k.get('price')))
-        bidList.sort(key=lambda k: float(k.get('price')), reverse=True)
-
-        # Get spread
-        minAsk = float(askList[0].get('price'))
-        maxBid = float(bidList[0].get('price'))
-        spread = minAsk - maxBid
-
-        # Create cutoffs
-        askCutoffList = askList[self.cutoff:]
-        bidCutoffList = bidList[self.cutoff:]
-
-        # Update visible table items
-        askList = askList[:self.cutoff]
-        askList.sort(key=lambda k: float(k.get('price')), reverse=True)
-        bidList = bidList[:self.cutoff]
-
-        return (askList, askCutoffList, bidList, bidCutoffList, spread)
+        data = getResilience().call('book', fetch)
+        self.restBook.applySnapshot(
+            [BookLevel.fromJson(item) for item in data.get('bids', [])],
+            [BookLevel.fromJson(item) for item in data.get('asks', [])])
 
     # Generates string for data model
     ############################################################################
-    def formatItemString(self, json):
-        # Unformated data strings
-        priceStr = json.get('price')
-        remainStr = json.get('amount')
-
+    def formatItemString(self, priceStr, remainStr):
         # Format strings
         priceStr = "{0:<{1}}".format(priceStr[:self.width], self.width)
-        priceStr.ljust(self.width)
         remainStr = "{0:<{1}}".format(remainStr[:self.width], self.width)
-        remainStr.ljust(self.width)
         s = priceStr + remainStr
 
         return s
 
-    # Generate item list
+    # Generate item list from the top levels of the book
     ############################################################################
-    def generateStringList(self, tupled):
-        askList, askCutoffList, bidList, bidCutoffList, spread = tupled
+    def generateStringList(self, snapshot):
+        askList = snapshot['asks']
+        bidList = snapshot['bids']
+        spread = snapshot['spread']
+        formatPrice = snapshot['priceScale'].format
+        formatAmount = snapshot['amountScale'].format
 
         # Clear string list
         self.stringList.clear()
 
-        # Generate ask cutoff JSON object, format and append to stringList
-        askCutoffSum = 0.0
-        for item in askCutoffList:
-            askCutoffSum = askCutoffSum + float(item.get('amount'))
-        askCutoffJson = {'price': '>' + askList[0].get('price'),
-                         'amount': str(askCutoffSum)}
-        self.stringList.append(self.formatItemString(askCutoffJson))
-
-        # Format and append ask items to stringList
-        for item in askList:
-            self.stringList.append(self.formatItemString(item))
-
-        # Generate spread JSON object, format and append to stringList
-        if (self.flag == 'ETHBTC'):
-            spreadJson = {'price': str("%.5f" % spread),
-                          'amount': 'SPREAD'}
-            self.stringList.append(self.formatItemString(spreadJson))
-        else:
-            spreadJson = {'price': str("%.2f" % spread),
-                          'amount': 'SPREAD'}
-            self.stringList.append(self.formatItemString(spreadJson))
+        # Summed amount of asks above the visible levels
+        self.stringList.append(self.formatItemString('>' + askList[-1].price,
+            formatAmount(snapshot['askDepthBeyond'])))
+
+        # Asks are displayed highest first, down to the spread
+        for level in reversed(askList):
+            self.stringList.append(self.formatItemString(level.price,
+                formatAmount(level.amount)))
+
+        # Spread
+        self.spreadRow = len(self.stringList)
+        self.stringList.append(self.formatItemString(
+            formatPrice(spread), 'SPREAD'))
 
-        # Format and append bid items to stringList
-        for item in bidList:
-            self.stringList.append(self.formatItemString(item))
+        # Bids are displayed highest first, down from the spread
+        for level in bidList:
+            self.stringList.append(self.formatItemString(level.price,
+                formatAmount(level.amount)))
 
-        # Generate bid cutoff JSON object, format and append to stringList
-        bidCutoffSum = 0.0
-        for item in bidCutoffList:
-            bidCutoffSum = bidCutoffSum + float(item.get('amount'))
-        bidCutoffJson = {'price': '<' + bidList[-1].get('price'),
-                         'amount': str(bidCutoffSum)}
-        self.stringList.append(self.formatItemString(bidCutoffJson))
+        # Summed amount of bids below the visible levels
+        self.stringList.append(self.formatItemString('<' + bidList[-1].price,
+            formatAmount(snapshot['bidDepthBeyond'])))
 
 
 class OrderBookDialog(QtWidgets.QDialog, Ui_OrderBookDialog):
     # Class data
     cutoff = None               # Number of asks and bids to display
     width = None                # Width of data fields
+    marketData = None           # Stream supplying the order books
     btcusdWorker = None         # Worker for updating btcusd data
     btcusdThread = QThread()    # Thread for worker
     ethusdWorker = None         # Worker for updating ethusd data
@@ -176,15 +210,13 @@ class OrderBookDialog(QtWidgets.QDialog, Ui_OrderBookDialog):
     ethbtcWorker = None         # Worker for updating ethbtc data
     ethbtcThread = QThread()    # Thread for worker
     btcusdModel = None          # Model for displaying btcusd data
-    btcusdModelIndex = None     # Model index for centering data around spread
     ethusdModel = None          # Model for displaying ethusd data
-    ethusdModelIndex = None     # Model index for centering data around spread
     ethbtcModel = None          # Model for displaying ethbtc data
-    ethbtcModelIndex = None     # Model index for centering data around spread
 
     # Initializer
-    def __init__(self, parent, cutoff=9, width=15):
+    def __init__(self, parent, marketData=None, cutoff=9, width=15):
         super(OrderBookDialog, self).__init__(parent)
+        self.marketData = marketData
         self.cutoff = cutoff
         self.width = width
         self.initUI()
@@ -194,17 +226,11 @@ class OrderBookDialog(QtWidgets.QDialog, Ui_OrderBookDialog):
     # Initialize UI
     def initUI(self):
         self.setupUi(self)
-        self.btcusdModel = QStandardItemModel(self.btcusdListView)
-        self.btcusdModelIndex = QModelIndex()
-        self.btcusdModelIndex = self.btcusdModel.createIndex(self.cutoff + 1, 0)
+        self.btcusdModel = OrderBookModel(self.btcusdListView)
         self.btcusdListView.setModel(self.btcusdModel)
-        self.ethusdModel = QStandardItemModel(self.ethusdListView)
-        self.ethusdModelIndex = QModelIndex()
-        self.ethusdModelIndex = self.ethusdModel.createIndex(self.cutoff + 1, 0)
+        self.ethusdModel = OrderBookModel(self.ethusdListView)
         self.ethusdListView.setModel(self.ethusdModel)
-        self.ethbtcModel = QStandardItemModel(self.ethbtcListView)
-        self.ethbtcModelIndex = QModelIndex()
-        self.ethbtcModelIndex = self.ethbtcModel.createIndex(self.cutoff + 1, 0)
+        self.ethbtcModel = OrderBookModel(self.ethbtcListView)
         self.ethbtcListView.setModel(self.ethbtcModel)
 
         # Set fixed-width font
@@ -213,27 +239,45 @@ class OrderBookDialog(QtWidgets.QDialog, Ui_OrderBookDialog):
         self.ethusdListView.setFont(fixedFont)
         self.ethbtcListView.setFont(fixedFont)
 
+        # All rows share one height, so the views never measure them
+        self.btcusdListView.setUniformItemSizes(True)
+        self.ethusdListView.setUniformItemSizes(True)
+        self.ethbtcListView.setUniformItemSizes(True)
+
         # Connect actions
         self.closeButton.clicked.connect(self.close)
 
+        # Only the book on the current tab is updated
+        self.orderBookTabs.currentChanged.connect(self.updateActivity)
+
     # Build threads
     ############################################################################
     def buildThreads(self):
-        self.btcusdWorker = Worker('BTCUSD', self.cutoff, self.width)
+        self.btcusdWorker = Worker('BTCUSD', self.getBook('BTCUSD'), self.marketData,
+            self.cutoff, self.width)
         self.btcusdWorker.moveToThread(self.btcusdThread)
         self.btcusdWorker.dataReady.connect(self.updateGui)
         self.btcusdThread.started.connect(self.btcusdWorker.work)
 
-        self.ethusdWorker = Worker('ETHUSD', self.cutoff, self.width)
+        self.ethusdWorker = Worker('ETHUSD', self.getBook('ETHUSD'), self.marketData,
+            self.cutoff, self.width)
         self.ethusdWorker.moveToThread(self.ethusdThread)
         self.ethusdWorker.dataReady.connect(self.updateGui)
         self.ethusdThread.started.connect(self.ethusdWorker.work)
 
-        self.ethbtcWorker = Worker('ETHBTC', self.cutoff, self.width)
+        self.ethbtcWorker = Worker('ETHBTC', self.getBook('ETHBTC'), self.marketData,
+            self.cutoff, self.width)
         self.ethbtcWorker.moveToThread(self.ethbtcThread)
         self.ethbtcWorker.dataReady.connect(self.updateGui)
         self.ethbtcThread.started.connect(self.ethbtcWorker.work)
 
+    # Returns the streamed book for flag, or None to let the worker poll
+    ############################################################################
+    def getBook(self, flag):
+        if self.marketData:
+            return self.marketData.getBook(flag)
+        return None
+
     # Start threads
     ############################################################################
     def startThreads(self):
@@ -241,34 +285,47 @@ class OrderBookDialog(QtWidgets.QDialog, Ui_OrderBookDialog):
         self.ethusdThread.start()
         self.ethbtcThread.start()
 
-    # Updates QListViews
+    # Updates QListViews with only the rows that changed
     ############################################################################
-    @pyqtSlot(str, list)
-    def updateGui(self, flag: str, stringList: list):
+    @pyqtSlot(str, list, int)
+    def updateGui(self, flag: str, stringList: list, spreadRow: int):
         if flag == 'BTCUSD':
-            self.btcusdModel.clear()
-            for string in stringList:
-                item = QStandardItem()
-                item.setText(string)
-                self.btcusdModel.appendRow(item)
-            self.btcusdListView.setCurrentIndex(self.btcusdModelIndex)
-            self.btcusdListView.scrollTo(self.btcusdModelIndex, 3)
+            model, view = self.btcusdModel, self.btcusdListView
         elif flag == 'ETHUSD':
-            self.ethusdModel.clear()
-            for string in stringList:
-                item = QStandardItem()
-                item.setText(string)
-                self.ethusdModel.appendRow(item)
-            self.ethusdListView.setCurrentIndex(self.ethusdModelIndex)
-            self.ethusdListView.scrollTo(self.ethusdModelIndex, 3)
+            model, view = self.ethusdModel, self.ethusdListView
         elif flag == 'ETHBTC':
-            self.ethbtcModel.clear()
-            for string in stringList:
-                item = QStandardItem()
-                item.setText(string)
-                self.ethbtcModel.appendRow(item)
-            self.ethbtcListView.setCurrentIndex(self.ethbtcModelIndex)
-            self.ethbtcListView.scrollTo(self.ethbtcModelIndex, 3)
+            model, view = self.ethbtcModel, self.ethbtcListView
+        else:
+            return
+
+        # Recenter only when the spread moves, keeping the user's selection
+        if model.setRows(stringList, spreadRow):
+            view.scrollTo(model.index(spreadRow),
+                QAbstractItemView.PositionAtCenter)
+
+    # Adapts update rates when minimized, restored, focused or unfocused
+    ############################################################################
+    def changeEvent(self, event):
+        super(OrderBookDialog, self).changeEvent(event)
+        if event.type() in (QEvent.WindowStateChange, QEvent.ActivationChange):
+            self.updateActivity()
+
+    # Full rate for the focused tab, hidden tabs and minimized dialog pause
+    ############################################################################
+    def updateActivity(self, *args):
+        if self.btcusdWorker is None:
+            return
+
+        shown = self.isVisible() and not self.isMinimized()
+        focused = shown and self.isActiveWindow()
+        current = self.orderBookTabs.currentWidget()
+
+        self.btcusdWorker.setActivity(focused,
+            shown and current is self.btcusdTab)
+        self.ethusdWorker.setActivity(focused,
+            shown and current is self.ethusdTab)
+        self.ethbtcWorker.setActivity(focused,
+            shown and current is self.ethbtcTab)
 
     # When user closes order book, stop threads
     ############################################################################
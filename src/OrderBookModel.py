@@ -0,0 +1,97 @@
+################################################################################
+#                                                                              #
+#  OrderBookModel.py                                                           #
+#  Author: Cody Johnson <codyj@protonmail.com>                                 #
+#                                                                              #
+################################################################################
+
+# List model for one order book ladder. New ladders are diffed against the
+# rows on screen: ask levels are added or removed at the top and bid levels
+# at the bottom, keeping the spread row aligned, and dataChanged is emitted
+# only for runs of rows whose text changed. A quiet book costs nothing.
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+
+class OrderBookModel(QAbstractListModel):
+    # Class data
+    rows = []               # Display strings, asks first then bids
+    spreadRow = -1          # Index of the spread row, -1 while empty
+
+    # Initializer
+    def __init__(self, parent=None):
+        super(OrderBookModel, self).__init__(parent)
+        self.rows = []
+
+    # Replaces the ladder, returns True if the spread row moved
+    ############################################################################
+    def setRows(self, rows, spreadRow):
+        if not rows:
+            self.clear()
+            return False
+
+        # Add or remove ask levels at the top so the spread rows line up
+        shift = spreadRow - self.spreadRow if self.rows else len(rows)
+        if shift > 0:
+            self.beginInsertRows(QModelIndex(), 0, shift - 1)
+            self.rows[0:0] = rows[:shift]
+            self.endInsertRows()
+        elif shift < 0:
+            self.beginRemoveRows(QModelIndex(), 0, -shift - 1)
+            del self.rows[:-shift]
+            self.endRemoveRows()
+
+        # Add or remove bid levels at the bottom
+        count = len(self.rows)
+        if len(rows) > count:
+            self.beginInsertRows(QModelIndex(), count, len(rows) - 1)
+            self.rows.extend(rows[count:])
+            self.endInsertRows()
+        elif len(rows) < count:
+            self.beginRemoveRows(QModelIndex(), len(rows), count - 1)
+            del self.rows[len(rows):]
+            self.endRemoveRows()
+
+        # Repaint only runs of rows whose text changed
+        first = None
+        for row, text in enumerate(rows):
+            if self.rows[row] != text:
+                self.rows[row] = text
+                if first is None:
+                    first = row
+            elif first is not None:
+                self.emitChanged(first, row - 1)
+                first = None
+        if first is not None:
+            self.emitChanged(first, len(rows) - 1)
+
+        moved = spreadRow != self.spreadRow
+        self.spreadRow = spreadRow
+        return moved
+
+    # Emits dataChanged for rows first through last
+    ############################################################################
+    def emitChanged(self, first, last):
+        self.dataChanged.emit(self.index(first), self.index(last),
+            [Qt.DisplayRole])
+
+    # Removes all rows
+    ############################################################################
+    def clear(self):
+        self.beginResetModel()
+        self.rows = []
+        self.spreadRow = -1
+        self.endResetModel()
+
+    # Number of rows
+    ############################################################################
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.rows)
+
+    # Display string of a row
+    ############################################################################
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        return self.rows[index.row()]
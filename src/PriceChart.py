@@ -0,0 +1,288 @@
+################################################################################
+#                                                                              #
+#  PriceChart.py                                                               #
+#  Author: Cody Johnson <codyj@protonmail.com>                                 #
+#                                                                              #
+################################################################################
+
+# Price line chart rendered off-screen into an Agg buffer. The axes and
+# Line2D stay alive between updates. Axes limits are snapped to a coarse
+# grid so they only move when the data leaves them; otherwise the cached
+# background is restored and only the line is redrawn (blitting).
+#
+# The line is downsampled to about one point per pixel of axes width, so
+# render time does not grow with the amount of history loaded. Candles and
+# volume bars are merged to one per three pixels and drawn as a single
+# PolyCollection, bodies and wicks together, in one draw call.
+#
+# setData and setSize may be called from any thread, render only from the
+# render thread (see ChartRenderer).
+
+import threading
+from datetime import datetime as dt
+import numpy as np
+import matplotlib.dates as md
+from matplotlib.figure import Figure
+from matplotlib.collections import PolyCollection
+from matplotlib.colors import to_rgba
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from Downsample import DownsampleCache
+import Candles
+from Crosshair import makeLayout
+
+class PriceChart:
+    # Class data
+    figure = None           # Off-screen figure
+    canvas = None           # Agg canvas holding the pixel buffer
+    axes = None             # Persistent axes
+    line = None             # Persistent price line
+    collection = None       # Persistent candle or volume quads
+    background = None       # Cached static layer for blitting
+    layout = None           # Hover layout of the last frame
+    series = None           # Full series and its downsampled levels
+    size = (640, 480)       # Pixel size requested by the view
+    times = None            # Pending unix times, None if unchanged
+    prices = None           # Pending prices
+    ohlcv = None            # Pending (opens, highs, lows, closes, volumes)
+    mode = Candles.LINE     # LINE, CANDLES or VOLUMES
+    modeChanged = False     # True if mode changed since last render
+    bars = None             # OHLCV bars for CANDLES and VOLUMES
+    verts = None            # Reusable quad vertices for bars
+    colors = None           # Reusable face and edge colors for bars
+    upColor = to_rgba('#26a65b')        # Bars closing at or above open
+    downColor = to_rgba('#d64541')      # Bars closing below open
+    wickColor = to_rgba('k')            # Candle wicks
+    resized = True          # True if size changed since last render
+    xStep = 1.0 / 24        # X limits snap to whole hours (in days)
+    tz = None               # Local time zone of the tick labels
+    yMargin = 0.05          # Fraction of price range padded above and below
+
+    # Initializer
+    def __init__(self, dpi=100):
+        self.figure = Figure(dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.lock = threading.Lock()
+        self.series = DownsampleCache()
+        self.bars = Candles.OhlcvBuffer()
+        self.setupAxes()
+        self.canvas.mpl_connect('draw_event', self.onDraw)
+
+    # Creates axes, grid, locator, formatter and the line once
+    ############################################################################
+    def setupAxes(self):
+        self.axes = self.figure.add_subplot(111)
+
+        # Customize axis
+        self.axes.xaxis.grid(True, which='major', linestyle=':')
+        self.axes.yaxis.grid(True, which='major', linestyle=':')
+
+        # Timestamps are UTC, show them in local time like before
+        self.tz = dt.now().astimezone().tzinfo
+        self.setLocator(1.0)
+
+        # Animated artists are left out of full draws and blitted instead
+        self.line, = self.axes.plot([], [], '-', color='k', linewidth=1,
+            animated=True)
+        self.line.set_visible(False)
+
+        # Zero-width candle wicks, drawn by their edges, then bodies
+        self.collection = PolyCollection([], linewidths=1, animated=True)
+        self.collection.set_visible(False)
+        self.axes.add_collection(self.collection)
+
+    # Caches the static layer after each full draw and redraws the line
+    ############################################################################
+    def onDraw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.drawData()
+
+    # Draws whichever of line and bars is visible
+    ############################################################################
+    def drawData(self):
+        self.axes.draw_artist(self.line)
+        self.axes.draw_artist(self.collection)
+
+    # Queues new unix times, prices and optional OHLCV for the next render
+    ############################################################################
+    def setData(self, times, prices, ohlcv=None):
+        with self.lock:
+            self.times = times
+            self.prices = prices
+            self.ohlcv = ohlcv
+
+    # Switches between LINE, CANDLES and VOLUMES at the next render
+    ############################################################################
+    def setMode(self, mode):
+        with self.lock:
+            if mode != self.mode:
+                self.mode = mode
+                self.modeChanged = True
+
+    # Queues a new pixel size for the next render
+    ############################################################################
+    def setSize(self, width, height):
+        with self.lock:
+            if (width, height) != self.size and width > 0 and height > 0:
+                self.size = (width, height)
+                self.resized = True
+
+    # Queues an empty chart for the next render
+    ############################################################################
+    def clear(self):
+        self.setData([], [])
+
+    # Applies pending changes and rasterizes, returns the RGBA buffer
+    ############################################################################
+    def render(self):
+        with self.lock:
+            times, prices, ohlcv = self.times, self.prices, self.ohlcv
+            self.times = self.prices = self.ohlcv = None
+            resized, self.resized = self.resized, False
+            modeChanged, self.modeChanged = self.modeChanged, False
+            width, height = self.size
+
+        fullDraw = resized or modeChanged or self.background is None
+        if resized:
+            dpi = self.figure.dpi
+            self.figure.set_size_inches(width / dpi, height / dpi)
+
+        if times is not None:
+            self.storeData(times, prices, ohlcv)
+        if times is not None or resized or modeChanged:
+            fullDraw = self.plotData() or fullDraw
+
+        if fullDraw:
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self.background)
+            self.drawData()
+
+        if times is not None or fullDraw:
+            self.updateLayout(height)
+
+        return self.canvas.buffer_rgba()
+
+    # Keeps the full series and bars with times as matplotlib dates
+    ############################################################################
+    def storeData(self, times, prices, ohlcv):
+        x = md.date2num(np.asarray(times, dtype='datetime64[s]'))
+        # Copied, the caller's arrays change on its next poll
+        self.series.setData(x, np.array(prices, dtype=float))
+        if ohlcv is not None:
+            self.bars.set(x, *ohlcv)
+        else:
+            self.bars.set([], [], [], [], [], [])
+
+    # Plots the current mode, returns True if the static layer must be
+    # redrawn
+    ############################################################################
+    def plotData(self):
+        self.line.set_visible(False)
+        self.collection.set_visible(False)
+
+        if self.mode == Candles.LINE:
+            x, y = self.series.x, self.series.y
+            self.plotLine()
+        else:
+            bars = self.plotBars()
+            x, y = bars[Candles.TIME], Candles.limitValues(bars, self.mode)
+
+        if x is None or not len(x):
+            return False
+
+        # Limits come from the full series so no extreme is cut off
+        return self.updateLimits(x, y)
+
+    # Publishes plot position, limits and data in unix seconds for hover
+    ############################################################################
+    def updateLayout(self, height):
+        if self.series.x is None:
+            return
+
+        # Matplotlib dates are days, pixel y grows upwards
+        epoch = md.date2num(np.datetime64(0, 's'))
+        toUnix = lambda days: (np.asarray(days) - epoch) * 86400.0
+        box = self.axes.bbox
+        bars = self.bars.view().copy()
+        bars[Candles.TIME] = toUnix(bars[Candles.TIME])
+
+        self.layout = makeLayout((box.x0, height - box.y1, box.width,
+            box.height), tuple(toUnix(self.axes.get_xlim())),
+            self.axes.get_ylim(), toUnix(self.series.x), self.series.y, bars)
+
+    # Plots the series downsampled to the axes' pixel width
+    ############################################################################
+    def plotLine(self):
+        x, y = self.series.get(int(self.axes.bbox.width))
+        self.line.set_data(x, y)
+        self.line.set_visible(len(x) > 0)
+
+    # Plots bars merged to one per three pixels, returns the bars plotted
+    ############################################################################
+    def plotBars(self):
+        bars, size = Candles.resample(self.bars.view(),
+            int(self.axes.bbox.width) // 3)
+        count = bars.shape[1]
+        if not count:
+            return bars
+
+        x = bars[Candles.TIME]
+        width = Candles.barWidth(x)
+        self.verts = Candles.reserveVerts(self.verts, 2 * count)
+        if self.colors is None or len(self.colors) < len(self.verts):
+            self.colors = np.empty((len(self.verts), 4))
+
+        if self.mode == Candles.CANDLES:
+            verts = Candles.candleVerts(x, bars, width, self.verts)
+            colors = self.colors[:2 * count]
+            colors[:count] = self.wickColor
+        else:
+            verts = Candles.volumeVerts(x, bars, width, self.verts)
+            colors = self.colors[:count]
+        colors[-count:] = np.where(Candles.rising(bars)[:, None],
+            self.upColor, self.downColor)
+
+        self.collection.set_verts(verts)
+        self.collection.set_facecolors(colors)
+        self.collection.set_edgecolors(colors)
+        self.collection.set_visible(True)
+        return bars
+
+    # Ticks at local hours divisible by 4, or at days when span (in days) is
+    # too long for that
+    ############################################################################
+    def setLocator(self, span):
+        if span <= 2:
+            formatter = md.DateFormatter('%H:%M', tz=self.tz)
+            locator = md.HourLocator(interval=4, tz=self.tz)
+        else:
+            formatter = md.DateFormatter('%m-%d', tz=self.tz)
+            locator = md.AutoDateLocator(tz=self.tz, maxticks=8)
+        self.axes.xaxis.set_major_formatter(formatter)
+        self.axes.xaxis.set_major_locator(locator)
+
+    # Snaps limits around the data, returns True if they changed
+    ############################################################################
+    def updateLimits(self, x, y):
+        xMin, xMax = self.axes.get_xlim()
+        yMin, yMax = self.axes.get_ylim()
+        changed = False
+
+        # X: whole hours around the window, moves about once an hour
+        if x[0] < xMin or x[-1] > xMax or x[-1] < xMax - 2 * self.xStep:
+            xMin = np.floor(x[0] / self.xStep) * self.xStep
+            xMax = np.ceil(x[-1] / self.xStep) * self.xStep
+            self.axes.set_xlim(xMin, xMax)
+            self.setLocator(xMax - xMin)
+            changed = True
+
+        # Y: padded price range, refit when data leaves it or uses too little
+        low = y.min()
+        high = y.max()
+        pad = max((high - low) * self.yMargin, abs(high) * 1e-4)
+        if (low < yMin or high > yMax
+                or (high - low) + 2 * pad < 0.5 * (yMax - yMin)):
+            self.axes.set_ylim(low - pad, high + pad)
+            changed = True
+
+        return changed
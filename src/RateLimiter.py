@@ -0,0 +1,143 @@
+################################################################################
+#                                                                              #
+#  RateLimiter.py                                                              #
+#  Author: Cody Johnson <codyj@protonmail.com>                                 #
+#                                                                              #
+################################################################################
+
+# https://docs.gemini.com/rest-api/#rate-limits
+
+# Process-wide token bucket limiter for Gemini REST calls. Public and
+# private endpoints draw from separate budgets. Callers queue by priority,
+# so order calls are served before balance or market data polling.
+
+import heapq, itertools, threading, time
+
+# Request priorities, lower is served first
+PRIORITY_ORDER = 0          # Placing or cancelling orders
+PRIORITY_ACCOUNT = 1        # Account state needed to trade
+PRIORITY_POLL = 2           # Periodic display refresh
+
+class TokenBucket:
+    # Class data
+    rate = 1.0              # Tokens added per second
+    capacity = 1.0          # Maximum tokens (burst size)
+    tokens = 0.0            # Tokens currently available
+    updated = 0.0           # Monotonic time of last refill
+
+    # Initializer
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    # Adds tokens earned since last refill
+    ############################################################################
+    def refill(self, now):
+        self.tokens = min(self.capacity,
+            self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    # Returns seconds until weight tokens are available
+    ############################################################################
+    def timeUntil(self, weight):
+        return max(0.0, (weight - self.tokens) / self.rate)
+
+
+class RateLimiter:
+    # Class data
+    buckets = {}            # TokenBucket per budget name
+    weights = {}            # Token cost per endpoint, default 1
+    queues = {}             # Heap of waiting (priority, seq) per budget
+    stats = {}              # Queue wait statistics per budget
+
+    # Initializer
+    def __init__(self):
+        # Public: 120 requests per minute, at most 1 per second sustained.
+        # Private: 600 requests per minute, at most 5 per second sustained.
+        self.buckets = {
+            'public': TokenBucket(1.0, 5.0),
+            'private': TokenBucket(5.0, 10.0)
+        }
+        self.weights = {
+            'book': 2,          # Full book snapshots are the heaviest call
+            'mytrades': 2,
+            'symbols': 1,
+            'symbols/details': 1,
+            'pubticker': 1,
+            'balances': 1
+        }
+        self.queues = {name: [] for name in self.buckets}
+        self.stats = {name: {'requests': 0, 'totalWait': 0.0, 'maxWait': 0.0,
+            'lastWait': 0.0} for name in self.buckets}
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+
+    # Returns token cost of an endpoint
+    ############################################################################
+    def getWeight(self, endpoint):
+        return self.weights.get(endpoint, 1)
+
+    # Blocks until the budget allows the request, returns seconds waited
+    ############################################################################
+    def acquire(self, budget, endpoint, priority=PRIORITY_POLL):
+        bucket = self.buckets[budget]
+        queue = self.queues[budget]
+        weight = min(self.getWeight(endpoint), bucket.capacity)
+        entry = (priority, next(self.sequence))
+        startTime = time.monotonic()
+
+        with self.condition:
+            heapq.heappush(queue, entry)
+            while True:
+                now = time.monotonic()
+                bucket.refill(now)
+
+                # Only the highest priority waiter may take tokens
+                if queue[0] == entry:
+                    if bucket.tokens >= weight:
+                        heapq.heappop(queue)
+                        bucket.tokens -= weight
+                        self.condition.notify_all()
+                        break
+                    self.condition.wait(bucket.timeUntil(weight))
+                else:
+                    self.condition.wait()
+
+            waited = time.monotonic() - startTime
+            stats = self.stats[budget]
+            stats['requests'] += 1
+            stats['totalWait'] += waited
+            stats['maxWait'] = max(stats['maxWait'], waited)
+            stats['lastWait'] = waited
+
+        return waited
+
+    # Returns queue wait statistics per budget
+    ############################################################################
+    def getStats(self):
+        with self.condition:
+            result = {}
+            for name, stats in self.stats.items():
+                result[name] = dict(stats)
+                result[name]['queued'] = len(self.queues[name])
+                result[name]['averageWait'] = (stats['totalWait']
+                    / stats['requests'] if stats['requests'] else 0.0)
+            return result
+
+
+# Shared rate limiter instance
+################################################################################
+rateLimiter = None
+rateLimiterLock = threading.Lock()
+
+# Returns the process-wide rate limiter, creating it on first use
+################################################################################
+def getRateLimiter():
+    global rateLimiter
+
+    with rateLimiterLock:
+        if rateLimiter is None:
+            rateLimiter = RateLimiter()
+        return rateLimiter
@@ -0,0 +1,128 @@
+################################################################################
+#                                                                              #
+#  Records.py                                                                  #
+#  Author: Cody Johnson <codyj@protonmail.com>                                 #
+#                                                                              #
+################################################################################
+
+# Typed records for Gemini payloads. JSON is decoded into these once, where
+# it enters the program, so the rest of the code reads attributes instead of
+# looking up dict keys. Each class declares __slots__, which stores fields
+# in a fixed layout with no per-object dict: a trade or book level takes a
+# fraction of the memory of the dict it came from.
+#
+# Decimal values stay the exact strings Gemini sent; FixedPoint parses them
+# wherever a symbol's scale is known.
+
+class Ticker:
+    __slots__ = (
+        'bid',              # Best bid price string, '' if unknown
+        'ask',              # Best ask price string, '' if unknown
+        'last'              # Last trade price string, '' if unknown
+    )
+
+    # Initializer
+    def __init__(self, bid='', ask='', last=''):
+        self.bid = bid
+        self.ask = ask
+        self.last = last
+
+    # Tickers are equal if all prices are
+    ############################################################################
+    def __eq__(self, other):
+        return (isinstance(other, Ticker) and self.bid == other.bid
+            and self.ask == other.ask and self.last == other.last)
+
+    # Decodes a pubticker response
+    ############################################################################
+    @staticmethod
+    def fromJson(data):
+        return Ticker(data.get('bid', ''), data.get('ask', ''),
+            data.get('last', ''))
+
+
+class Trade:
+    __slots__ = (
+        'tid',              # Trade id, unique per exchange
+        'symbol',           # Symbol the trades were requested for: "btcusd"
+        'orderId',          # Id of the order that filled
+        'type',             # 'Buy' or 'Sell'
+        'timestampms',      # Milliseconds since epoch
+        'amount',           # Amount string
+        'price',            # Price string
+        'feeAmount',        # Fee string
+        'feeCurrency'       # Currency of the fee: "USD"
+    )
+
+    # Initializer
+    def __init__(self, tid, symbol, orderId, type, timestampms, amount,
+            price, feeAmount, feeCurrency):
+        self.tid = tid
+        self.symbol = symbol
+        self.orderId = orderId
+        self.type = type
+        self.timestampms = timestampms
+        self.amount = amount
+        self.price = price
+        self.feeAmount = feeAmount
+        self.feeCurrency = feeCurrency
+
+    # Decodes one mytrades entry for symbol
+    ############################################################################
+    @staticmethod
+    def fromJson(data, symbol=''):
+        return Trade(int(data.get('tid', 0)), symbol,
+            str(data.get('order_id')), str(data.get('type')),
+            int(data.get('timestampms', 0)), str(data.get('amount', '0')),
+            str(data.get('price', '0')), str(data.get('fee_amount', '0')),
+            str(data.get('fee_currency')))
+
+
+class BookLevel:
+    __slots__ = (
+        'price',            # Price string
+        'amount'            # Amount string
+    )
+
+    # Initializer
+    def __init__(self, price, amount):
+        self.price = price
+        self.amount = amount
+
+    # Decodes one level of a book response
+    ############################################################################
+    @staticmethod
+    def fromJson(data):
+        return BookLevel(data['price'], data['amount'])
+
+
+class DepthLevel:
+    __slots__ = (
+        'price',            # Price string as received
+        'amount'            # Fixed-point amount in the book's amount scale
+    )
+
+    # Initializer
+    def __init__(self, price, amount):
+        self.price = price
+        self.amount = amount
+
+
+class Balance:
+    __slots__ = (
+        'currency',         # Currency code: "BTC"
+        'amount',           # Total amount string
+        'available'         # Amount string available for trading
+    )
+
+    # Initializer
+    def __init__(self, currency, amount, available):
+        self.currency = currency
+        self.amount = amount
+        self.available = available
+
+    # Decodes one balances entry
+    ############################################################################
+    @staticmethod
+    def fromJson(data):
+        return Balance(data['currency'], data['amount'], data['available'])
@@ -0,0 +1,182 @@
+################################################################################
+#                                                                              #
+#  Resilience.py                                                               #
+#  Author: Cody Johnson <codyj@protonmail.com>                                 #
+#                                                                              #
+################################################################################
+
+# Retry with exponential backoff and full jitter, plus a circuit breaker per
+# endpoint. While a circuit is open, calls fail at once without touching the
+# network, so a broken endpoint costs almost nothing until it recovers.
+
+import random, threading, time, requests
+
+# Circuit states
+CLOSED = 'closed'           # Calls pass through
+OPEN = 'open'               # Calls fail fast
+HALF_OPEN = 'half-open'     # One trial call allowed
+
+# Errors worth retrying: network failures, 429/5xx and malformed JSON
+RETRYABLE = (requests.RequestException, ValueError)
+
+class CircuitOpenError(Exception):
+    # Initializer
+    def __init__(self, endpoint, retryIn):
+        super(CircuitOpenError, self).__init__('Circuit open for ' + endpoint
+            + ', retry in ' + str(round(retryIn, 1)) + 's')
+        self.endpoint = endpoint
+        self.retryIn = retryIn
+
+
+class CircuitBreaker:
+    # Class data
+    endpoint = ''           # Name of protected endpoint
+    state = CLOSED          # CLOSED, OPEN or HALF_OPEN
+    failures = 0            # Consecutive failures
+    failureThreshold = 5    # Failures in a row that open the circuit
+    resetTimeout = 30.0     # Seconds open before a trial call
+    openedAt = 0.0          # Monotonic time circuit opened
+
+    # Initializer
+    def __init__(self, endpoint, failureThreshold=5, resetTimeout=30.0):
+        self.endpoint = endpoint
+        self.failureThreshold = failureThreshold
+        self.resetTimeout = resetTimeout
+        self.lock = threading.Lock()
+
+    # Raises CircuitOpenError unless a call may go ahead
+    ############################################################################
+    def before(self):
+        with self.lock:
+            if self.state == CLOSED:
+                return
+
+            retryIn = self.openedAt + self.resetTimeout - time.monotonic()
+            if self.state == OPEN and retryIn <= 0:
+                # Let exactly one trial call through
+                self.state = HALF_OPEN
+                return
+
+            raise CircuitOpenError(self.endpoint, max(retryIn, 0.0))
+
+    # Closes the circuit after a successful call
+    ############################################################################
+    def recordSuccess(self):
+        with self.lock:
+            self.failures = 0
+            self.state = CLOSED
+
+    # Opens the circuit after too many failures or a failed trial
+    ############################################################################
+    def recordFailure(self):
+        with self.lock:
+            self.failures += 1
+            if (self.state == HALF_OPEN
+                    or self.failures >= self.failureThreshold):
+                self.state = OPEN
+                self.openedAt = time.monotonic()
+
+
+class Resilience:
+    # Class data
+    maxRetries = 3          # Retries after the first attempt
+    baseDelay = 0.5         # Seconds before first retry
+    maxDelay = 8.0          # Upper bound for a single backoff
+    breakers = {}           # CircuitBreaker per endpoint
+    metrics = {}            # Call counters per endpoint
+
+    # Initializer
+    def __init__(self, maxRetries=3, baseDelay=0.5, maxDelay=8.0):
+        self.maxRetries = maxRetries
+        self.baseDelay = baseDelay
+        self.maxDelay = maxDelay
+        self.breakers = {}
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    # Returns breaker and metrics for endpoint, creating them on first use
+    ############################################################################
+    def getBreaker(self, endpoint):
+        with self.lock:
+            breaker = self.breakers.get(endpoint)
+            if breaker is None:
+                breaker = CircuitBreaker(endpoint)
+                self.breakers[endpoint] = breaker
+                self.metrics[endpoint] = {'calls': 0, 'successes': 0,
+                    'failures': 0, 'retries': 0, 'shortCircuited': 0}
+            return breaker
+
+    # Increments a counter for endpoint
+    ############################################################################
+    def count(self, endpoint, counter):
+        with self.lock:
+            self.metrics[endpoint][counter] += 1
+
+    # Calls func, retrying retryable errors with backoff. Raises the last
+    # error once retries run out, or CircuitOpenError while open.
+    ############################################################################
+    def call(self, endpoint, func, maxRetries=None):
+        if maxRetries is None:
+            maxRetries = self.maxRetries
+
+        breaker = self.getBreaker(endpoint)
+        self.count(endpoint, 'calls')
+
+        attempt = 0
+        while True:
+            try:
+                breaker.before()
+            except CircuitOpenError:
+                self.count(endpoint, 'shortCircuited')
+                raise
+
+            try:
+                result = func()
+            except RETRYABLE as err:
+                breaker.recordFailure()
+                if attempt >= maxRetries:
+                    self.count(endpoint, 'failures')
+                    raise
+
+                # Full jitter keeps pollers from retrying in lockstep
+                attempt += 1
+                self.count(endpoint, 'retries')
+                time.sleep(random.uniform(0, min(self.maxDelay,
+                    self.baseDelay * 2 ** attempt)))
+                continue
+            except Exception:
+                # Any failed trial must reopen the circuit, or it would stay
+                # half-open and refuse every call from then on
+                breaker.recordFailure()
+                self.count(endpoint, 'failures')
+                raise
+
+            breaker.recordSuccess()
+            self.count(endpoint, 'successes')
+            return result
+
+    # Returns counters and circuit state per endpoint
+    ############################################################################
+    def getMetrics(self):
+        with self.lock:
+            result = {}
+            for endpoint, metrics in self.metrics.items():
+                result[endpoint] = dict(metrics)
+                result[endpoint]['state'] = self.breakers[endpoint].state
+            return result
+
+
+# Shared resilience policy instance
+################################################################################
+resilience = None
+resilienceLock = threading.Lock()
+
+# Returns the process-wide resilience policy, creating it on first use
+################################################################################
+def getResilience():
+    global resilience
+
+    with resilienceLock:
+        if resilience is None:
+            resilience = Resilience()
+        return resilience
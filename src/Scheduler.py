@@ -0,0 +1,215 @@
+################################################################################
+#                                                                              #
+#  Scheduler.py                                                                #
+#  Author: Cody Johnson <codyj@protonmail.com>                                 #
+#                                                                              #
+################################################################################
+
+# Central job scheduler. One thread sleeps until the next job is due and
+# hands it to a small worker pool. A job that is still running when it comes
+# due again is skipped, so slow jobs never stack up behind themselves.
+
+import random, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+class Job:
+    # Class data
+    name = ''               # Unique job name
+    func = None             # Callable run on each interval
+    interval = 0.0          # Seconds between runs
+    jitter = 0.0            # Random seconds added to each interval
+    requiresNetwork = False # Only run while online
+    nextRun = 0.0           # Monotonic time of next run
+    running = False         # True while func is executing
+    cancelled = False       # True once removed from the scheduler
+    runs = 0                # Number of completed runs
+    failures = 0            # Number of runs that raised
+    skipped = 0             # Runs coalesced because previous was running
+    lastDuration = 0.0      # Seconds taken by last run
+    maxDuration = 0.0       # Longest run in seconds
+    totalDuration = 0.0     # Sum of all run durations
+
+    # Initializer
+    def __init__(self, name, func, interval, jitter=0.0,
+            requiresNetwork=False):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.requiresNetwork = requiresNetwork
+
+    # Sets next run one interval (plus jitter) from now
+    ############################################################################
+    def reschedule(self, now):
+        self.nextRun = now + self.interval + random.uniform(0, self.jitter)
+
+    # Returns timing statistics
+    ############################################################################
+    def getStats(self):
+        return {
+            'interval': self.interval,
+            'running': self.running,
+            'runs': self.runs,
+            'failures': self.failures,
+            'skipped': self.skipped,
+            'lastDuration': self.lastDuration,
+            'maxDuration': self.maxDuration,
+            'averageDuration': self.totalDuration / self.runs if self.runs
+                else 0.0
+        }
+
+
+class Scheduler:
+    # Class data
+    jobs = {}               # Jobs keyed by name
+    isOnline = None         # Callable returning True while network is up
+    executor = None         # Worker pool running job functions
+    thread = None           # Thread dispatching due jobs
+    stopped = True          # Flag to stop dispatching
+
+    # Initializer
+    def __init__(self, maxWorkers=4, isOnline=None):
+        self.jobs = {}
+        self.isOnline = isOnline if isOnline else (lambda: True)
+        self.executor = ThreadPoolExecutor(max_workers=maxWorkers)
+        self.condition = threading.Condition()
+
+    # Starts the dispatch thread
+    ############################################################################
+    def start(self):
+        with self.condition:
+            if not self.stopped:
+                return
+            self.stopped = False
+
+        self.thread = threading.Thread(target=self.run, args=())
+        self.thread.daemon = True
+        self.thread.start()
+
+    # Stops dispatching, running jobs are allowed to finish
+    ############################################################################
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+        self.executor.shutdown(wait=False)
+
+    # Adds or replaces a job, runs it right away unless delayed
+    ############################################################################
+    def addJob(self, name, func, interval, jitter=0.0, requiresNetwork=False,
+            delay=0.0):
+        job = Job(name, func, interval, jitter, requiresNetwork)
+        job.nextRun = time.monotonic() + delay
+
+        with self.condition:
+            old = self.jobs.get(name)
+            if old:
+                old.cancelled = True
+            self.jobs[name] = job
+            self.condition.notify_all()
+
+        return job
+
+    # Removes a job, a run in progress is allowed to finish
+    ############################################################################
+    def cancelJob(self, name):
+        with self.condition:
+            job = self.jobs.pop(name, None)
+            if job:
+                job.cancelled = True
+
+    # Returns True if a job with name is scheduled
+    ############################################################################
+    def hasJob(self, name):
+        with self.condition:
+            return name in self.jobs
+
+    # Changes a job's interval, takes effect from now
+    ############################################################################
+    def setInterval(self, name, interval):
+        with self.condition:
+            job = self.jobs.get(name)
+            if job:
+                job.interval = interval
+                job.reschedule(time.monotonic())
+                self.condition.notify_all()
+
+    # Returns the interval of a job, or None if there is no such job
+    ############################################################################
+    def getInterval(self, name):
+        with self.condition:
+            job = self.jobs.get(name)
+            return job.interval if job else None
+
+    # Makes a job due immediately
+    ############################################################################
+    def runNow(self, name):
+        with self.condition:
+            job = self.jobs.get(name)
+            if job:
+                job.nextRun = time.monotonic()
+                self.condition.notify_all()
+
+    # Wakes the dispatcher to re-evaluate jobs, e.g. after going online
+    ############################################################################
+    def wake(self):
+        with self.condition:
+            self.condition.notify_all()
+
+    # Dispatch loop, sleeps until the earliest due job
+    ############################################################################
+    def run(self):
+        with self.condition:
+            while not self.stopped:
+                now = time.monotonic()
+                online = self.isOnline()
+                timeout = None
+
+                for job in list(self.jobs.values()):
+                    if job.requiresNetwork and not online:
+                        continue
+
+                    if job.nextRun <= now:
+                        self.dispatch(job, now)
+
+                    wait = job.nextRun - now
+                    if timeout is None or wait < timeout:
+                        timeout = wait
+
+                self.condition.wait(timeout)
+
+    # Submits a due job unless its previous run is still going
+    ############################################################################
+    def dispatch(self, job, now):
+        job.reschedule(now)
+
+        if job.running:
+            job.skipped += 1
+            return
+
+        job.running = True
+        self.executor.submit(self.runJob, job)
+
+    # Runs a job and records timing, exceptions do not kill the scheduler
+    ############################################################################
+    def runJob(self, job):
+        startTime = time.perf_counter()
+        try:
+            job.func()
+        except Exception as err:
+            job.failures += 1
+            print('Job ' + job.name + ' failed: ' + str(err))
+        finally:
+            duration = time.perf_counter() - startTime
+            with self.condition:
+                job.running = False
+                job.runs += 1
+                job.lastDuration = duration
+                job.maxDuration = max(job.maxDuration, duration)
+                job.totalDuration += duration
+
+    # Returns timing statistics for all jobs
+    ############################################################################
+    def getStats(self):
+        with self.condition:
+            return {name: job.getStats() for name, job in self.jobs.items()}
@@ -0,0 +1,224 @@
+################################################################################
+#                                                                              #
+#  SymbolCache.py                                                              #
+#  Author: Cody Johnson <codyj@protonmail.com>                                 #
+#                                                                              #
+################################################################################
+
+# https://docs.gemini.com/rest-api/#symbols
+# https://docs.gemini.com/rest-api/#symbol-details
+
+# Symbol list and per-symbol details (tick size, quote increment, minimum
+# order size) persisted to disk. Cached data is served right away and
+# refreshed in the background once it is older than the TTL.
+
+import json, os.path, threading, time
+from FixedPoint import FixedPoint, fromIncrement
+from HttpTransport import getTransport
+from RateLimiter import getRateLimiter
+from Resilience import getResilience
+
+class SymbolCache:
+    # Class data
+    baseUrl = ''
+    cachePath = ''          # Path of Symbols.json
+    ttl = 86400             # Seconds before cached data is refreshed
+    symbols = []            # List of symbols: ["btcusd", "ethusd", "ethbtc"]
+    details = {}            # Symbol details keyed by symbol
+    updated = 0             # Time of last successful refresh
+    refreshThread = None    # Thread running a background refresh
+
+    # Initializer
+    def __init__(self, cachePath='../data/Symbols.json', ttl=86400,
+            isSandbox=False):
+        if isSandbox:
+            self.baseUrl = 'https://api.sandbox.gemini.com/v1/'
+        else:
+            self.baseUrl = 'https://api.gemini.com/v1/'
+
+        self.cachePath = cachePath
+        self.ttl = ttl
+        self.symbols = []
+        self.details = {}
+        self.lock = threading.RLock()
+        self.load()
+
+    # Loads cached symbols from disk
+    ############################################################################
+    def load(self):
+        if not os.path.exists(self.cachePath):
+            return
+
+        try:
+            with open(self.cachePath, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        with self.lock:
+            self.symbols = data.get('symbols', [])
+            self.details = data.get('details', {})
+            self.updated = data.get('updated', 0)
+
+    # Saves cached symbols to disk
+    ############################################################################
+    def save(self):
+        with self.lock:
+            data = {
+                'updated': self.updated,
+                'symbols': self.symbols,
+                'details': self.details
+            }
+
+        try:
+            with open(self.cachePath, 'w') as f:
+                json.dump(data, f)
+        except OSError as err:
+            print('ERROR:  Cannot save symbol cache: ' + str(err))
+
+    # Returns True if cached data is older than the TTL
+    ############################################################################
+    def isStale(self):
+        return time.time() - self.updated > self.ttl
+
+    # Fetches symbol list and details for the given symbols from Gemini
+    ############################################################################
+    def refresh(self, watched=()):
+        def fetch():
+            getRateLimiter().acquire('public', 'symbols')
+            return getTransport().getJson(self.baseUrl + 'symbols')
+
+        symbols = getResilience().call('symbols', fetch)
+
+        # Refresh details we already hold plus any newly watched symbols
+        with self.lock:
+            wanted = set(self.details) | set(watched)
+
+        details = {}
+        for symbol in wanted:
+            if symbol in symbols:
+                details[symbol] = self.fetchDetails(symbol)
+
+        with self.lock:
+            self.symbols = symbols
+            self.details.update(details)
+            self.updated = time.time()
+        self.save()
+
+    # Refreshes in a background thread unless one is already running
+    ############################################################################
+    def refreshInBackground(self, watched=()):
+        with self.lock:
+            if self.refreshThread and self.refreshThread.is_alive():
+                return
+
+            self.refreshThread = threading.Thread(target=self.runRefresh,
+                args=(tuple(watched),))
+            self.refreshThread.daemon = True
+            self.refreshThread.start()
+
+    # Background refresh, keeps cached data on failure
+    ############################################################################
+    def runRefresh(self, watched):
+        try:
+            self.refresh(watched)
+        except Exception as err:
+            print('Symbol refresh failed: ' + str(err))
+
+    # Refreshes in the background if data is stale or details are missing
+    ############################################################################
+    def prefetch(self, watched):
+        with self.lock:
+            missing = [s for s in watched if s not in self.details]
+
+        if missing or self.isStale():
+            self.refreshInBackground(watched)
+
+    # Fetches details for one symbol
+    ############################################################################
+    def fetchDetails(self, symbol):
+        def fetch():
+            getRateLimiter().acquire('public', 'symbols/details')
+            return getTransport().getJson(self.baseUrl + 'symbols/details/'
+                + symbol)
+
+        data = getResilience().call('symbols/details', fetch)
+
+        return {
+            'baseCurrency': data.get('base_currency'),
+            'quoteCurrency': data.get('quote_currency'),
+            'tickSize': str(data.get('tick_size')),
+            'quoteIncrement': str(data.get('quote_increment')),
+            'minOrderSize': str(data.get('min_order_size'))
+        }
+
+    # Returns symbol list, blocks on the network only if nothing is cached
+    ############################################################################
+    def getSymbols(self):
+        if not self.symbols:
+            self.refresh()
+        elif self.isStale():
+            self.refreshInBackground()
+
+        with self.lock:
+            return list(self.symbols)
+
+    # Returns details for symbol, fetching them once if missing
+    ############################################################################
+    def getDetails(self, symbol):
+        symbol = symbol.lower()
+
+        with self.lock:
+            details = self.details.get(symbol)
+        if details:
+            return details
+
+        details = self.fetchDetails(symbol)
+        with self.lock:
+            self.details[symbol] = details
+        self.save()
+
+        return details
+
+    # Returns the smallest order quantity increment as a string
+    ############################################################################
+    def getTickSize(self, symbol):
+        return self.getDetails(symbol)['tickSize']
+
+    # Returns the smallest price increment as a string
+    ############################################################################
+    def getQuoteIncrement(self, symbol):
+        return self.getDetails(symbol)['quoteIncrement']
+
+    # Returns the minimum order size as a string
+    ############################################################################
+    def getMinOrderSize(self, symbol):
+        return self.getDetails(symbol)['minOrderSize']
+
+    # Returns (price, amount) FixedPoint scales for symbol without blocking,
+    # 8 decimals for both until details are cached
+    ############################################################################
+    def getScales(self, symbol):
+        with self.lock:
+            details = self.details.get(symbol.lower())
+        if not details:
+            return (FixedPoint(8), FixedPoint(8))
+
+        return (fromIncrement(details['quoteIncrement']),
+            fromIncrement(details['tickSize']))
+
+
+# Shared symbol cache instance
+################################################################################
+symbolCache = None
+symbolCacheLock = threading.Lock()
+
+# Returns the process-wide symbol cache, creating it on first use
+################################################################################
+def getSymbolCache():
+    global symbolCache
+
+    with symbolCacheLock:
+        if symbolCache is None:
+            symbolCache = SymbolCache()
+        return symbolCache
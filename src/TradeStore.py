@@ -0,0 +1,176 @@
+################################################################################
+#                                                                              #
+#  TradeStore.py                                                               #
+#  Author: Cody Johnson <codyj@protonmail.com>                                 #
+#                                                                              #
+################################################################################
+
+# https://docs.gemini.com/rest-api/#get-past-trades
+
+# Local SQLite copy of an account's trades, keyed on account and tid and
+# indexed on symbol and time. The first sync of a symbol pages through its
+# whole history; after that only trades at or after the newest stored
+# timestamp are requested, so a poll is one small request per symbol. The
+# blotter and anything else reading trades query the store instead of
+# Gemini.
+
+import sqlite3, threading
+from Records import Trade
+
+class TradeStore:
+    # Class data
+    dbPath = ''             # Path of the SQLite database
+    accountKey = ''         # API key of the account, trades are per account
+    isSandbox = False       # True for a sandbox account
+    pageSize = 500          # limit_trades per request, Gemini's maximum
+    maxPages = 100          # Requests per symbol per sync, bounds a backfill
+    connection = None       # SQLite connection shared by all threads
+
+    # Initializer
+    def __init__(self, account, dbPath=None):
+        if dbPath is None:
+            if account.get('isSandbox'):
+                dbPath = '../data/TradesSandbox.db'
+            else:
+                dbPath = '../data/Trades.db'
+
+        self.dbPath = dbPath
+        self.accountKey = account.get('apiKey', '')
+        self.isSandbox = bool(account.get('isSandbox'))
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(dbPath, check_same_thread=False)
+        self.createTables()
+
+    # Creates the trades table and its indexes if missing. Version 0 tables
+    # were keyed on tid alone, their rows are copied into the new table
+    ############################################################################
+    def createTables(self):
+        with self.lock, self.connection:
+            version = self.connection.execute(
+                'PRAGMA user_version').fetchone()[0]
+            migrate = version < 1 and self.hasTable('trades')
+            if migrate:
+                self.connection.execute(
+                    'ALTER TABLE trades RENAME TO tradesOld')
+
+            # Accounts on both sides of one trade share its tid
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS trades ('
+                'tid INTEGER NOT NULL, account TEXT NOT NULL, '
+                'symbol TEXT NOT NULL, orderId TEXT, type TEXT, '
+                'timestampms INTEGER NOT NULL, amount TEXT, price TEXT, '
+                'feeAmount TEXT, feeCurrency TEXT, '
+                'PRIMARY KEY (account, tid))')
+            if migrate:
+                # Dropping the old table drops its indexes too
+                self.connection.execute(
+                    'INSERT OR IGNORE INTO trades SELECT * FROM tradesOld')
+                self.connection.execute('DROP TABLE tradesOld')
+            self.connection.execute('PRAGMA user_version = 1')
+
+            self.connection.execute(
+                'CREATE INDEX IF NOT EXISTS tradesSymbolTime '
+                'ON trades (symbol, timestampms)')
+            self.connection.execute(
+                'CREATE INDEX IF NOT EXISTS tradesTime '
+                'ON trades (timestampms)')
+
+    # Returns True if the database has a table called name, caller holds
+    # the lock
+    ############################################################################
+    def hasTable(self, name):
+        return self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (name,)).fetchone() is not None
+
+    # Returns True if this store holds the trades of account
+    ############################################################################
+    def isFor(self, account):
+        return (self.accountKey == account.get('apiKey', '')
+            and self.isSandbox == bool(account.get('isSandbox')))
+
+    # Closes the database
+    ############################################################################
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    # Stores trades, returns the ones not stored before
+    ############################################################################
+    def insertTrades(self, trades):
+        inserted = []
+        with self.lock, self.connection:
+            for trade in trades:
+                cursor = self.connection.execute(
+                    'INSERT OR IGNORE INTO trades VALUES '
+                    '(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (trade.tid, self.accountKey, trade.symbol, trade.orderId,
+                    trade.type, trade.timestampms, trade.amount, trade.price,
+                    trade.feeAmount, trade.feeCurrency))
+                if cursor.rowcount == 1:
+                    inserted.append(trade)
+        return inserted
+
+    # Returns the newest stored timestamp in ms for symbol, None if none
+    ############################################################################
+    def lastTimestamp(self, symbol):
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT MAX(timestampms) FROM trades '
+                'WHERE symbol = ? AND account = ?',
+                (symbol, self.accountKey)).fetchone()
+        return row[0]
+
+    # Returns stored trades for symbol, all symbols if None, oldest first,
+    # optionally limited to start <= timestampms < end
+    ############################################################################
+    def getTrades(self, symbol=None, start=None, end=None):
+        query = ('SELECT tid, symbol, orderId, type, timestampms, amount, '
+            'price, feeAmount, feeCurrency FROM trades WHERE account = ?')
+        args = [self.accountKey]
+
+        if symbol is not None:
+            query += ' AND symbol = ?'
+            args.append(symbol)
+        if start is not None:
+            query += ' AND timestampms >= ?'
+            args.append(start)
+        if end is not None:
+            query += ' AND timestampms < ?'
+            args.append(end)
+        query += ' ORDER BY timestampms, tid'
+
+        with self.lock:
+            rows = self.connection.execute(query, args).fetchall()
+        return [Trade(*row) for row in rows]
+
+    # Fetches trades newer than the store for each symbol, backfilling
+    # symbols with none stored. Returns new trades keyed by symbol, or the
+    # error string of the first failed request
+    ############################################################################
+    def sync(self, api, symbols):
+        newTrades = {}
+
+        for symbol in symbols:
+            since = self.lastTimestamp(symbol)
+            if since is None:
+                since = 0
+            newTrades[symbol] = []
+
+            for page in range(self.maxPages):
+                trades = api.getTrades(symbol, timestamp=since,
+                    limitTrades=self.pageSize)
+                if not isinstance(trades, list):
+                    return trades
+
+                newTrades[symbol] += self.insertTrades(trades)
+
+                # A short page is the end, otherwise continue after it
+                if len(trades) < self.pageSize:
+                    break
+                newest = max(trade.timestampms for trade in trades)
+                if newest <= since:
+                    break
+                since = newest
+
+        return newTrades
@@ -0,0 +1,240 @@
+################################################################################
+#                                                                              #
+#  TradesTableModel.py                                                         #
+#  Author: Cody Johnson <codyj@protonmail.com>                                 #
+#                                                                              #
+################################################################################
+
+# Append-only trade blotter. Trades are kept column by column and only new
+# trades (by tid) are inserted, each at its sorted position, so a refresh
+# costs O(new trades) instead of rebuilding every row. Cells are formatted
+# on demand in data(), which the view only calls for visible rows. Amounts,
+# prices and fees are fixed-point ints, parsed from the API's decimal
+# strings, so sorting on them is exact. A value with more decimals than its
+# column's scale refines the whole column to them.
+
+from bisect import bisect_left
+from datetime import datetime as dt
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from FixedPoint import FixedPoint, fromIncrement
+
+# Columns
+ORDER_ID, TYPE, TIME, AMOUNT, PRICE, FEE = range(6)
+
+class TradesTableModel(QAbstractTableModel):
+    # Class data
+    headers = ['Order ID', 'Type', 'Date + Time', 'Amount', 'Price', 'Fee']
+    tids = set()            # Trade ids already in the buffer
+    orderIds = []           # Column buffers, one entry per trade
+    types = []
+    timestamps = []         # Milliseconds since epoch
+    newestTimestamp = 0     # Newest of timestamps, 0 if empty
+    amounts = []            # Fixed-point in amountScale
+    prices = []             # Fixed-point in priceScale
+    feeAmounts = []         # Fixed-point in feeScale
+    feeCurrencies = []
+    priceScale = None       # FixedPoint of prices
+    amountScale = None      # FixedPoint of amounts
+    feeScale = None         # FixedPoint of fees
+    order = []              # Buffer indices sorted ascending by sort key
+    keys = []               # (sort key, buffer index), parallel to order
+    sortColumn = TIME       # Column the rows are sorted by
+    sortOrder = Qt.DescendingOrder
+
+    # Initializer
+    def __init__(self, priceScale=None, amountScale=None, parent=None):
+        super(TradesTableModel, self).__init__(parent)
+        self.priceScale = priceScale if priceScale else FixedPoint(8)
+        self.amountScale = amountScale if amountScale else FixedPoint(8)
+        self.feeScale = FixedPoint(10)
+        self.resetBuffers()
+
+    # Empties all column buffers
+    ############################################################################
+    def resetBuffers(self):
+        self.tids = set()
+        self.orderIds = []
+        self.types = []
+        self.timestamps = []
+        self.newestTimestamp = 0
+        self.amounts = []
+        self.prices = []
+        self.feeAmounts = []
+        self.feeCurrencies = []
+        self.order = []
+        self.keys = []
+
+    # Removes all trades
+    ############################################################################
+    def clear(self):
+        self.beginResetModel()
+        self.resetBuffers()
+        self.endResetModel()
+
+    # Inserts Trade records not seen before, returns the number inserted
+    ############################################################################
+    def appendTrades(self, trades):
+        inserted = 0
+
+        for trade in trades:
+            if trade.tid in self.tids:
+                continue
+
+            # Parse before touching the buffers, a bad trade is skipped whole
+            try:
+                amount = self.parseColumn(AMOUNT, trade.amount)
+                price = self.parseColumn(PRICE, trade.price)
+                fee = self.parseColumn(FEE, trade.feeAmount)
+            except (ValueError, ArithmeticError) as err:
+                print('Skipping trade ' + str(trade.tid) + ': ' + str(err))
+                continue
+
+            self.tids.add(trade.tid)
+            index = len(self.orderIds)
+            self.orderIds.append(trade.orderId)
+            self.types.append(trade.type)
+            self.timestamps.append(trade.timestampms)
+            self.newestTimestamp = max(self.newestTimestamp, trade.timestampms)
+            self.amounts.append(amount)
+            self.prices.append(price)
+            self.feeAmounts.append(fee)
+            self.feeCurrencies.append(trade.feeCurrency)
+            self.insertIndex(index)
+            inserted += 1
+
+        return inserted
+
+    # Returns the FixedPoint of column AMOUNT, PRICE or FEE
+    ############################################################################
+    def columnScale(self, column):
+        if column == AMOUNT:
+            return self.amountScale
+        elif column == PRICE:
+            return self.priceScale
+        return self.feeScale
+
+    # Parses text for column AMOUNT, PRICE or FEE, first refining the
+    # column's scale if text has more decimals than it holds
+    ############################################################################
+    def parseColumn(self, column, text):
+        scale = self.columnScale(column)
+        try:
+            return scale.parse(text)
+        except ValueError:
+            finer = fromIncrement(text)
+            if finer.decimals <= scale.decimals:
+                raise
+            self.rescale(column, finer)
+            return finer.parse(text)
+
+    # Switches column AMOUNT, PRICE or FEE to a finer scale
+    ############################################################################
+    def rescale(self, column, scale):
+        factor = scale.factor // self.columnScale(column).factor
+        if column == AMOUNT:
+            self.amountScale = scale
+            self.amounts = [value * factor for value in self.amounts]
+        elif column == PRICE:
+            self.priceScale = scale
+            self.prices = [value * factor for value in self.prices]
+        else:
+            self.feeScale = scale
+            self.feeAmounts = [value * factor for value in self.feeAmounts]
+
+        # Sort keys hold the old values
+        if column == self.sortColumn:
+            self.sort(self.sortColumn, self.sortOrder)
+
+    # Inserts buffer index at its sorted position and notifies views
+    ############################################################################
+    def insertIndex(self, index):
+        key = (self.sortKey(self.sortColumn, index), index)
+        pos = bisect_left(self.keys, key)
+        row = self.toRow(pos, len(self.order) + 1)
+
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.keys.insert(pos, key)
+        self.order.insert(pos, index)
+        self.endInsertRows()
+
+    # Maps a position in the ascending order list to a view row
+    ############################################################################
+    def toRow(self, pos, count):
+        if self.sortOrder == Qt.DescendingOrder:
+            return count - 1 - pos
+        return pos
+
+    # Returns the raw value rows are sorted by
+    ############################################################################
+    def sortKey(self, column, index):
+        if column == ORDER_ID:
+            orderId = self.orderIds[index]
+            return int(orderId) if orderId.isdigit() else 0
+        elif column == TYPE:
+            return self.types[index]
+        elif column == AMOUNT:
+            return self.amounts[index]
+        elif column == PRICE:
+            return self.prices[index]
+        elif column == FEE:
+            return self.feeAmounts[index]
+        return self.timestamps[index]
+
+    # Sorts by column, called by the view when a header is clicked
+    ############################################################################
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        self.sortColumn = column
+        self.sortOrder = order
+        self.keys = sorted((self.sortKey(column, i), i)
+            for i in range(len(self.orderIds)))
+        self.order = [i for key, i in self.keys]
+        self.layoutChanged.emit()
+
+    # Number of trades
+    ############################################################################
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.order)
+
+    # Number of columns
+    ############################################################################
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.headers)
+
+    # Column titles
+    ############################################################################
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+        return None
+
+    # Formats a cell when the view asks for it
+    ############################################################################
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+
+        i = self.order[self.toRow(index.row(), len(self.order))]
+        column = index.column()
+
+        if column == ORDER_ID:
+            return self.orderIds[i]
+        elif column == TYPE:
+            return self.types[i]
+        elif column == TIME:
+            return dt.fromtimestamp(self.timestamps[i] / 1000.0).strftime(
+                "%Y-%m-%d %H:%M:%S")
+        elif column == AMOUNT:
+            return self.amountScale.format(self.amounts[i])
+        elif column == PRICE:
+            return '$' + self.priceScale.format(self.prices[i], 2)
+        elif column == FEE:
+            if self.feeCurrencies[i] == 'USD':
+                return '$' + self.feeScale.format(self.feeAmounts[i], 2)
+            return (self.feeScale.format(self.feeAmounts[i], 8) + ' '
+                + self.feeCurrencies[i])
+        return None
@@ -0,0 +1,84 @@
+################################################################################
+#                                                                              #
+#  UiUpdateBus.py                                                              #
+#  Author: Cody Johnson <codyj@protonmail.com>                                 #
+#                                                                              #
+################################################################################
+
+# Thread-safe, frame-coalesced GUI updates. Worker threads post the latest
+# state per widget; the GUI thread applies whatever is pending at most once
+# per frame. A burst of updates to one widget costs a single apply, and
+# labels whose text did not change are left alone.
+
+import threading
+from PyQt5.QtCore import QObject, QTimer, pyqtSlot, pyqtSignal
+
+class UiUpdateBus(QObject):
+    # Create signals
+    scheduleSignal = pyqtSignal()
+
+    # Class data
+    pending = {}            # Latest (func, args) per key
+    scheduled = False       # True while a flush is queued
+    timer = None            # Single-shot frame timer
+    applied = 0             # Number of updates applied
+    coalesced = 0           # Number of updates replaced before applying
+
+    # Initializer
+    def __init__(self, parent=None, frameInterval=16):
+        super(UiUpdateBus, self).__init__(parent)
+        self.pending = {}
+        self.lock = threading.Lock()
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(frameInterval)
+        self.timer.timeout.connect(self.flush)
+
+        # Queued across threads, starts the timer on the GUI thread
+        self.scheduleSignal.connect(self.schedule)
+
+    # Posts func(*args) to run on the GUI thread, replacing any pending
+    # update with the same key. Safe to call from any thread.
+    ############################################################################
+    def post(self, key, func, *args):
+        with self.lock:
+            if key in self.pending:
+                self.coalesced += 1
+            self.pending[key] = (func, args)
+            if self.scheduled:
+                return
+            self.scheduled = True
+
+        self.scheduleSignal.emit()
+
+    # Posts new text for a label
+    ############################################################################
+    def setText(self, label, text):
+        self.post(label, self.applyText, label, text)
+
+    # Sets label text only if it changed
+    ############################################################################
+    def applyText(self, label, text):
+        if label.text() != text:
+            label.setText(text)
+
+    # Starts the frame timer
+    ############################################################################
+    @pyqtSlot()
+    def schedule(self):
+        if not self.timer.isActive():
+            self.timer.start()
+
+    # Applies all pending updates
+    ############################################################################
+    @pyqtSlot()
+    def flush(self):
+        with self.lock:
+            pending = self.pending
+            self.pending = {}
+            self.scheduled = False
+
+        for func, args in pending.values():
+            func(*args)
+        self.applied += len(pending)
@@ -211,9 +211,9 @@ class Ui_MainWindow(object):
         self.tradesTab.setObjectName("tradesTab")
         self.gridLayout_8 = QtWidgets.QGridLayout(self.tradesTab)
         self.gridLayout_8.setObjectName("gridLayout_8")
-        self.tradesListView = QtWidgets.QListView(self.tradesTab)
-        self.tradesListView.setObjectName("tradesListView")
-        self.gridLayout_8.addWidget(self.tradesListView, 0, 0, 1, 1)
+        self.tradesTableView = QtWidgets.QTableView(self.tradesTab)
+        self.tradesTableView.setObjectName("tradesTableView")
+        self.gridLayout_8.addWidget(self.tradesTableView, 0, 0, 1, 1)
         self.mainTabWidget.addTab(self.tradesTab, "")
         self.openOrdersTab = QtWidgets.QWidget()
         self.openOrdersTab.setObjectName("openOrdersTab")
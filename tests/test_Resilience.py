@@ -0,0 +1,85 @@
+################################################################################
+#                                                                              #
+#  test_Resilience.py                                                          #
+#  Author: Cody Johnson <codyj@protonmail.com>                                 #
+#                                                                              #
+################################################################################
+
+# Circuit breaker transitions: CLOSED -> OPEN -> HALF_OPEN -> CLOSED or OPEN
+
+import os, sys, time, unittest
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from Resilience import (Resilience, CircuitBreaker, CircuitOpenError, CLOSED,
+    OPEN)
+
+class ResilienceTest(unittest.TestCase):
+    # Returns a policy without retries whose breaker reopens quickly
+    ############################################################################
+    def makePolicy(self):
+        policy = Resilience(maxRetries=0)
+        policy.breakers['test'] = CircuitBreaker('test', failureThreshold=5,
+            resetTimeout=0.01)
+        policy.metrics['test'] = {'calls': 0, 'successes': 0, 'failures': 0,
+            'retries': 0, 'shortCircuited': 0}
+        return policy
+
+    # Fails the call with a connection error
+    ############################################################################
+    def fail(self):
+        raise requests.ConnectionError('down')
+
+    # Opens the circuit with threshold failures
+    ############################################################################
+    def openCircuit(self, policy):
+        for i in range(5):
+            with self.assertRaises(requests.ConnectionError):
+                policy.call('test', self.fail)
+        self.assertEqual(policy.breakers['test'].state, OPEN)
+
+    # Open circuits fail fast until the reset timeout
+    ############################################################################
+    def testOpenFailsFast(self):
+        policy = self.makePolicy()
+        self.openCircuit(policy)
+        with self.assertRaises(CircuitOpenError):
+            policy.call('test', lambda: 'ok')
+
+    # A successful trial closes the circuit
+    ############################################################################
+    def testTrialSuccessCloses(self):
+        policy = self.makePolicy()
+        self.openCircuit(policy)
+        time.sleep(0.02)
+        self.assertEqual(policy.call('test', lambda: 'ok'), 'ok')
+        self.assertEqual(policy.breakers['test'].state, CLOSED)
+
+    # A failed trial reopens the circuit
+    ############################################################################
+    def testTrialFailureReopens(self):
+        policy = self.makePolicy()
+        self.openCircuit(policy)
+        time.sleep(0.02)
+        with self.assertRaises(requests.ConnectionError):
+            policy.call('test', self.fail)
+        self.assertEqual(policy.breakers['test'].state, OPEN)
+
+    # A trial failing with a non-retryable error reopens the circuit too,
+    # it must not stay half-open
+    ############################################################################
+    def testTrialOtherErrorReopens(self):
+        policy = self.makePolicy()
+        self.openCircuit(policy)
+        time.sleep(0.02)
+        with self.assertRaises(KeyError):
+            policy.call('test', lambda: {}['price'])
+        self.assertEqual(policy.breakers['test'].state, OPEN)
+
+        time.sleep(0.02)
+        self.assertEqual(policy.call('test', lambda: 'ok'), 'ok')
+        self.assertEqual(policy.breakers['test'].state, CLOSED)
+
+
+if __name__ == '__main__':
+    unittest.main()
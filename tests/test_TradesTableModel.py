@@ -0,0 +1,101 @@
+################################################################################
+#                                                                              #
+#  test_TradesTableModel.py                                                    #
+#  Author: Cody Johnson <codyj@protonmail.com>                                 #
+#                                                                              #
+################################################################################
+
+# Gemini mytrades payloads through Trade.fromJson into the trade blotter
+
+import os, sys, unittest
+from PyQt5.QtCore import QCoreApplication
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from Records import Trade
+from TradesTableModel import TradesTableModel, AMOUNT, PRICE, FEE
+
+# Example response of https://docs.gemini.com/rest-api/#get-past-trades
+MYTRADES = [
+    {
+        'price': '3648.09',
+        'amount': '0.0027343246',
+        'timestamp': 1547232911,
+        'timestampms': 1547232911021,
+        'type': 'Buy',
+        'aggressor': True,
+        'fee_currency': 'USD',
+        'fee_amount': '0.024937655575035',
+        'tid': 107317526,
+        'order_id': '107317524',
+        'exchange': 'gemini',
+        'is_clearing_fill': False,
+        'symbol': 'BTCUSD'
+    },
+    {
+        'price': '3633.00',
+        'amount': '0.00423677',
+        'timestamp': 1547220640,
+        'timestampms': 1547220640195,
+        'type': 'Buy',
+        'aggressor': False,
+        'fee_currency': 'USD',
+        'fee_amount': '0.038480463525',
+        'tid': 106921823,
+        'order_id': '106817811',
+        'exchange': 'gemini',
+        'is_clearing_fill': False,
+        'symbol': 'BTCUSD'
+    }
+]
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+class TradesTableModelTest(unittest.TestCase):
+    # Returns the display text of a cell
+    ############################################################################
+    def cell(self, model, row, column):
+        return model.data(model.index(row, column))
+
+    # Decimals beyond the default scales refine them instead of failing
+    ############################################################################
+    def testDocumentedPayload(self):
+        model = TradesTableModel()
+        trades = [Trade.fromJson(item, 'btcusd') for item in MYTRADES]
+        self.assertEqual(model.appendTrades(trades), 2)
+        self.assertEqual(model.rowCount(), 2)
+
+        # Newest first
+        self.assertEqual(self.cell(model, 0, AMOUNT), '0.0027343246')
+        self.assertEqual(self.cell(model, 0, PRICE), '$3648.09')
+        self.assertEqual(self.cell(model, 0, FEE), '$0.02')
+        self.assertEqual(self.cell(model, 1, AMOUNT), '0.0042367700')
+        self.assertEqual(model.feeScale.format(model.feeAmounts[0]),
+            '0.024937655575035')
+
+        # Appending the same trades again inserts nothing
+        self.assertEqual(model.appendTrades(trades), 0)
+
+    # A malformed trade is skipped without leaving the buffers out of step
+    ############################################################################
+    def testMalformedTradeSkipped(self):
+        model = TradesTableModel()
+        bad = Trade.fromJson(dict(MYTRADES[0], fee_amount='0.1.2'), 'btcusd')
+        good = Trade.fromJson(MYTRADES[1], 'btcusd')
+        self.assertEqual(model.appendTrades([bad, good]), 1)
+        self.assertEqual(len(model.orderIds), len(model.feeAmounts))
+        self.assertNotIn(bad.tid, model.tids)
+        self.assertEqual(self.cell(model, 0, PRICE), '$3633.00')
+
+    # Refining the sort column keeps rows in order
+    ############################################################################
+    def testRefineSortColumn(self):
+        model = TradesTableModel()
+        model.sort(AMOUNT)
+        model.appendTrades([Trade.fromJson(MYTRADES[1], 'btcusd')])
+        model.appendTrades([Trade.fromJson(MYTRADES[0], 'btcusd')])
+        self.assertEqual([self.cell(model, row, AMOUNT) for row in range(2)],
+            ['0.0027343246', '0.0042367700'])
+
+
+if __name__ == '__main__':
+    unittest.main()